@@ -0,0 +1,405 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["pyyaml", "python-dateutil"]
+# ///
+"""Benchmark query_conversations.py against a synthetic corpus.
+
+Generates a reproducible projects tree shaped like Claude Code's (same
+entry types, progress noise, tool results, images, subagent dirs), then
+times the hot paths and each subcommand. Subcommands run three ways:
+
+    no-index    --no-index, every file parsed
+    cold-index  fresh metadata index (first run after a wipe)
+    warm        same index again, nothing changed
+
+Only the index is cold: dropping the OS page cache needs root, so the
+corpus is normally in memory for every run.
+
+Rows marked +sub also read the subagent transcripts (--include-subagents),
+and count them in MB/s and sess/s.
+
+Usage:
+    bench_query_conversations.py                       # 500 sessions, temp dir
+    bench_query_conversations.py --sessions 5000 --keep /tmp/corpus
+    bench_query_conversations.py --corpus /tmp/corpus  # reuse, skip generation
+    bench_query_conversations.py --format json > bench_output.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import query_conversations as qc  # noqa: E402
+
+# A word that only some sessions contain, so search has real hits and misses.
+RARE_TERM = "flibbertigibbet"
+ABSENT_TERM = "zyzzyva-not-present"
+WORDS = (
+  "hook config shell parse index cache session project token output file "
+  "commit branch test build error retry timeout plugin theme prompt"
+).split()
+
+
+# ──────────────────────────── corpus ────────────────────────────
+
+
+@dataclass(slots=True)
+class CorpusSpec:
+  sessions: int = 500
+  projects: int = 12
+  min_turns: int = 5
+  max_turns: int = 80
+  tool_result_ratio: float = 0.6
+  tool_result_bytes: int = 4000
+  image_ratio: float = 0.02
+  subagent_ratio: float = 0.2
+  rare_term_ratio: float = 0.1
+  seed: int = 1
+
+
+class _Session:
+  """Writes one session's entries with consistent ids and timestamps."""
+
+  def __init__(self, rng: random.Random, session_id: str, cwd: str, start: datetime):
+    self.rng = rng
+    self.session_id = session_id
+    self.cwd = cwd
+    self.now = start
+    self.parent: Optional[str] = None
+    self.lines: list[str] = []
+
+  def _uuid(self) -> str:
+    return str(uuid.UUID(int=self.rng.getrandbits(128)))
+
+  def entry(self, etype: str, **fields: Any) -> None:
+    self.now += timedelta(seconds=self.rng.randint(1, 40))
+    uid = self._uuid()
+    record = {
+      "parentUuid": self.parent,
+      "isSidechain": False,
+      "userType": "external",
+      "cwd": self.cwd,
+      "sessionId": self.session_id,
+      "version": "2.0.0",
+      "gitBranch": "main",
+      "type": etype,
+      **fields,
+      "uuid": uid,
+      "timestamp": self.now.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+    }
+    self.parent = uid
+    self.lines.append(json.dumps(record, ensure_ascii=False))
+
+  def raw(self, record: dict[str, Any]) -> None:
+    self.lines.append(json.dumps(record, ensure_ascii=False))
+
+  def write(self, path: Path, mtime: float) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(self.lines) + "\n", encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+  return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _fill_session(s: _Session, spec: CorpusSpec, turns: int, rare: bool) -> None:
+  rng = s.rng
+  s.raw({"type": "summary", "summary": _sentence(rng, 6), "leafUuid": s._uuid()})
+  s.raw({"type": "file-history-snapshot", "messageId": s._uuid(), "snapshot": {"files": {}}})
+  for turn in range(turns):
+    text = _sentence(rng, rng.randint(5, 60))
+    if rare and turn == turns // 2:
+      text += f" {RARE_TERM}"
+    s.entry("user", message={"role": "user", "content": text})
+    msg_id = f"msg_{s._uuid()}"
+    s.entry(
+      "assistant",
+      message={
+        "id": msg_id,
+        "type": "message",
+        "role": "assistant",
+        "model": "claude-bench",
+        "content": [{"type": "text", "text": _sentence(rng, rng.randint(10, 120))}],
+        "usage": {"input_tokens": rng.randint(10, 5000), "output_tokens": rng.randint(10, 800)},
+      },
+    )
+    if rng.random() >= spec.tool_result_ratio:
+      continue
+    tool_id = f"toolu_{s._uuid().replace('-', '')[:24]}"
+    s.entry(
+      "assistant",
+      message={
+        "id": msg_id,
+        "type": "message",
+        "role": "assistant",
+        "content": [
+          {
+            "type": "tool_use",
+            "id": tool_id,
+            "name": rng.choice(["Read", "Bash", "Grep"]),
+            "input": {"file_path": f"{s.cwd}/src/{rng.choice(WORDS)}.py"},
+          }
+        ],
+      },
+    )
+    s.raw(
+      {
+        "type": "progress",
+        "data": {"type": "bash_progress", "output": "." * 200},
+        "toolUseID": tool_id,
+        "timestamp": s.now.isoformat(),
+      }
+    )
+    size = rng.randint(spec.tool_result_bytes // 4, spec.tool_result_bytes * 2)
+    body = (_sentence(rng, 12) + "\n") * max(1, size // 80)
+    content: Any = body
+    if rng.random() < spec.image_ratio:
+      data = base64.b64encode(rng.randbytes(rng.randint(20_000, 200_000))).decode()
+      content = [
+        {"type": "text", "text": body},
+        {"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": data}},
+      ]
+    s.entry(
+      "user",
+      message={"role": "user", "content": [{"type": "tool_result", "tool_use_id": tool_id, "content": content}]},
+      toolUseResult={"stdout": body[:2000], "stderr": "", "interrupted": False},
+    )
+
+
+def generate_corpus(root: Path, spec: CorpusSpec) -> None:
+  """Write spec.sessions sessions under root, deterministically from spec.seed."""
+  rng = random.Random(spec.seed)
+  epoch = datetime(2025, 1, 1, tzinfo=timezone.utc)
+  for i in range(spec.sessions):
+    project = f"proj-{i % spec.projects:03d}"
+    proj_dir = root / f"-Users-bench-Code-{project}"
+    session_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    start = epoch + timedelta(hours=i * 7 + rng.randint(0, 6))
+    s = _Session(rng, session_id, f"/Users/bench/Code/{project}", start)
+    _fill_session(s, spec, rng.randint(spec.min_turns, spec.max_turns), rng.random() < spec.rare_term_ratio)
+    s.write(proj_dir / f"{session_id}.jsonl", s.now.timestamp())
+    if rng.random() < spec.subagent_ratio:
+      sub = _Session(rng, session_id, s.cwd, start)
+      _fill_session(sub, spec, rng.randint(spec.min_turns, spec.min_turns * 3), False)
+      sub.write(proj_dir / session_id / "subagents" / f"agent-{sub._uuid()[:8]}.jsonl", sub.now.timestamp())
+
+
+# ──────────────────────────── timing ────────────────────────────
+
+
+@dataclass(slots=True)
+class Result:
+  name: str
+  mode: str
+  seconds: float
+  mb_per_s: float
+  sessions_per_s: float
+
+
+def _best_of(repeat: int, fn: Callable[[], Any], before: Optional[Callable[[], None]] = None) -> float:
+  best = float("inf")
+  for _ in range(repeat):
+    if before:
+      before()
+    t0 = time.perf_counter()
+    fn()
+    best = min(best, time.perf_counter() - t0)
+  return best
+
+
+def _run_cli(argv: list[str]) -> None:
+  with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+    qc.main(argv)
+
+
+def run_benchmarks(corpus: Path, repeat: int, jobs: int) -> list[Result]:
+  paths = sorted(qc.iter_jsonl_paths(corpus))
+  # Subagent transcripts only count where --include-subagents reads them.
+  all_paths = sorted(qc.iter_jsonl_paths(corpus, include_subagents=True))
+  n = len(paths)
+  sizes = {
+    False: (sum(p.stat().st_size for p in paths), n),
+    True: (sum(p.stat().st_size for p in all_paths), len(all_paths)),
+  }
+  results: list[Result] = []
+
+  def record(name: str, mode: str, seconds: float, subagents: bool = False) -> None:
+    total_bytes, files = sizes[subagents]
+    results.append(Result(name, mode, seconds, total_bytes / 1e6 / seconds, files / seconds))
+
+  record("parse_metadata", "direct", _best_of(repeat, lambda: [qc.parse_metadata(p) for p in paths]))
+  record(
+    "parse_metadata +sub",
+    "direct",
+    _best_of(repeat, lambda: [qc.parse_metadata(p) for p in all_paths]),
+    subagents=True,
+  )
+  record("search_paths hit", "direct", _best_of(repeat, lambda: list(qc.search_paths(paths, RARE_TERM))))
+  record("search_paths miss", "direct", _best_of(repeat, lambda: list(qc.search_paths(paths, ABSENT_TERM))))
+
+  index_path = corpus.parent / f"{corpus.name}-bench-index.sqlite"
+  mid = datetime.fromtimestamp(
+    sorted(p.stat().st_mtime for p in paths)[n // 2], timezone.utc
+  ).date().isoformat()
+  commands = {
+    "stats": ["stats", "--format", "json"],
+    "list": ["list", "--format", "json"],
+    "list --limit 20": ["list", "--limit", "20", "--format", "json"],
+    "list --since": ["list", "--since", mid, "--format", "json"],
+    "last": ["last", "--format", "json"],
+    "search": ["search", RARE_TERM, "--format", "json"],
+    "search --indexed": ["search", RARE_TERM, "--indexed", "--format", "json"],
+    "stats +sub": ["stats", "--include-subagents", "--format", "json"],
+    "search +sub": ["search", RARE_TERM, "--include-subagents", "--format", "json"],
+  }
+
+  def wipe_index() -> None:
+    index_path.unlink(missing_ok=True)
+
+  for name, argv in commands.items():
+    if argv[0] in ("list", "search", "stats"):
+      argv = argv + ["--jobs", str(jobs)]
+    base = ["--projects-dir", str(corpus), "--index", str(index_path)]
+    sub = "--include-subagents" in argv
+    if name != "search --indexed":
+      no_index = ["--projects-dir", str(corpus), "--no-index", *argv]
+      record(name, "no-index", _best_of(repeat, lambda: _run_cli(no_index)), sub)
+    record(name, "cold-index", _best_of(repeat, lambda: _run_cli([*base, *argv]), before=wipe_index), sub)
+    record(name, "warm", _best_of(repeat, lambda: _run_cli([*base, *argv])), sub)
+  wipe_index()
+  return results
+
+
+def render(results: list[Result], corpus: Path, fmt: str) -> str:
+  paths = list(qc.iter_jsonl_paths(corpus))
+  subagents = len(list(qc.iter_jsonl_paths(corpus, include_subagents=True))) - len(paths)
+  size_mb = sum(p.stat().st_size for p in paths) / 1e6
+  if fmt == "json":
+    return json.dumps(
+      {
+        "sessions": len(paths),
+        "subagent_sessions": subagents,
+        "corpus_mb": round(size_mb, 2),
+        "results": [asdict(r) for r in results],
+      },
+      indent=2,
+    )
+  lines = [
+    f"corpus: {len(paths)} sessions (+{subagents} subagent), {size_mb:.1f} MB ({corpus})",
+    "",
+    f"{'benchmark':<22} {'mode':<10} {'time':>9} {'MB/s':>9} {'sess/s':>10}",
+    f"{'-' * 22} {'-' * 10} {'-' * 9} {'-' * 9} {'-' * 10}",
+  ]
+  for r in results:
+    lines.append(
+      f"{r.name:<22} {r.mode:<10} {r.seconds * 1000:>7.1f}ms {r.mb_per_s:>9.1f} {r.sessions_per_s:>10.0f}"
+    )
+  return "\n".join(lines)
+
+
+# ──────────────────────────── CLI ────────────────────────────
+
+
+def build_parser() -> argparse.ArgumentParser:
+  p = argparse.ArgumentParser(
+    prog="bench_query_conversations.py",
+    description=__doc__,
+    formatter_class=argparse.RawDescriptionHelpFormatter,
+  )
+  defaults = CorpusSpec()
+  p.add_argument("--corpus", type=Path, help="Benchmark an existing projects dir (no generation)")
+  p.add_argument("--keep", type=Path, help="Generate into DIR and leave it there")
+  p.add_argument("--sessions", type=int, default=defaults.sessions)
+  p.add_argument("--projects", type=int, default=defaults.projects)
+  p.add_argument("--min-turns", type=int, default=defaults.min_turns)
+  p.add_argument("--max-turns", type=int, default=defaults.max_turns)
+  p.add_argument(
+    "--tool-result-ratio",
+    type=float,
+    default=defaults.tool_result_ratio,
+    help="Share of turns that call a tool",
+  )
+  p.add_argument(
+    "--tool-result-bytes", type=int, default=defaults.tool_result_bytes, help="Typical tool result size"
+  )
+  p.add_argument(
+    "--image-ratio",
+    type=float,
+    default=defaults.image_ratio,
+    help="Share of tool results carrying a base64 image",
+  )
+  p.add_argument(
+    "--subagent-ratio",
+    type=float,
+    default=defaults.subagent_ratio,
+    help="Share of sessions with a subagent transcript (read by the +sub rows)",
+  )
+  p.add_argument(
+    "--rare-term-ratio",
+    type=float,
+    default=defaults.rare_term_ratio,
+    help=f"Share of sessions mentioning {RARE_TERM!r}, the term searches look for",
+  )
+  p.add_argument("--seed", type=int, default=defaults.seed)
+  p.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; best time wins")
+  p.add_argument("--jobs", type=int, default=1, help="--jobs passed to list/search/stats")
+  p.add_argument("--format", choices=["text", "json"], default="text")
+  return p
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+  args = build_parser().parse_args(argv)
+  spec = CorpusSpec(
+    sessions=args.sessions,
+    projects=args.projects,
+    min_turns=args.min_turns,
+    max_turns=args.max_turns,
+    tool_result_ratio=args.tool_result_ratio,
+    tool_result_bytes=args.tool_result_bytes,
+    image_ratio=args.image_ratio,
+    subagent_ratio=args.subagent_ratio,
+    rare_term_ratio=args.rare_term_ratio,
+    seed=args.seed,
+  )
+
+  tmp: Optional[str] = None
+  if args.corpus:
+    corpus = args.corpus
+  else:
+    if args.keep:
+      corpus = args.keep
+    else:
+      tmp = tempfile.mkdtemp(prefix="qc-bench-")
+      corpus = Path(tmp) / "projects"
+    t0 = time.perf_counter()
+    generate_corpus(corpus, spec)
+    print(f"generated {spec.sessions} sessions in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+  try:
+    print(render(run_benchmarks(corpus, args.repeat, args.jobs), corpus, args.format))
+  finally:
+    if tmp:
+      shutil.rmtree(tmp, ignore_errors=True)
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
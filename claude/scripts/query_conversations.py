@@ -17,6 +17,7 @@ Commands:
     get     Metadata + path for a specific session id
     search  Find sessions whose JSONL contains a term (returns paths)
     stats   Per-project activity overview
+    archive Compress sessions idle for N days (.jsonl.gz / .jsonl.xz)
 
 Typical pipeline:
     query_conversations.py list --paths-only --since 2025-11-01 \\
@@ -26,29 +27,85 @@ Typical pipeline:
 from __future__ import annotations
 
 import argparse
+import errno
+import gzip
 import json
+import lzma
+import os
+import re
+import shutil
+import sqlite3
 import sys
+import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Any, Iterable, Iterator, Optional
+from typing import Any, BinaryIO, Iterable, Iterator, Optional
 
 DEFAULT_PROJECTS_DIR = Path.home() / "Code" / "dotfiles" / "claude" / "projects"
 PREVIEW_LEN = 100
 # How many entries to scan when sniffing a project path — cwd is usually on
 # every entry, but summary/permission-mode entries may not carry it.
 CWD_SNIFF_LINES = 20
+# Metadata cache, kept beside the projects dir (never inside it — Claude
+# Code owns that tree).
+INDEX_FILENAME = "conversations-index.sqlite"
+# Allowance for clock skew between message timestamps and file mtimes
+# when pruning --since candidates by mtime.
+MTIME_SLACK = timedelta(minutes=10)
+# Read size for search_paths; bounds memory per file scanned.
+SEARCH_CHUNK = 1 << 20
+# Raw key/value pairs _sniff_entry looks for. Inside a JSON string every
+# quote is escaped, so a raw `"key":` byte sequence is always a real key
+# (at some depth). Group 2 is a plain string value; group 3 is the first
+# byte of anything else (escaped string, number, literal, container).
+SNIFF_RE = re.compile(rb'"(type|timestamp|role|isMeta)"\s*:\s*(?:"([^"\\]*)"|(.))')
+# "type" values that only occur nested inside user/assistant entries
+# (content blocks, sources, the API message object).
+NESTED_TYPES = frozenset(
+  {
+    b"text",
+    b"tool_use",
+    b"tool_result",
+    b"image",
+    b"document",
+    b"thinking",
+    b"redacted_thinking",
+    b"message",
+    b"base64",
+    b"url",
+    b"file",
+    b"server_tool_use",
+    b"web_search_tool_result",
+    b"tool_reference",
+  }
+)
+# Session files, plain or archived. Archives are decompressed as they are
+# read, so offsets and checkpoints always refer to the JSONL inside.
+ARCHIVE_CODECS = {".gz": gzip.open, ".xz": lzma.open}
+SESSION_SUFFIXES = (".jsonl", *(".jsonl" + c for c in ARCHIVE_CODECS))
+# Words kept by the term index: 2-64 word characters, lowercased.
+TERM_RE = re.compile(r"\w{2,64}")
+# Below this many files to parse, process start-up costs more than it saves.
+PARALLEL_MIN_FILES = 16
+# Files per process per batch when streaming metadata out of the pool.
+METADATA_BATCH_PER_JOB = 64
+# Longest the index write lock is held during a scan before committing.
+INDEX_COMMIT_SECONDS = 0.5
 
 
 # ──────────────────────────── data model ────────────────────────────
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationMeta:
   """Metadata-only view of a JSONL conversation file.
 
   Never holds message bodies. Cheap to construct, cheap to serialise.
+  Slotted: stats and list runs can hold tens of thousands of these.
   """
 
   session_id: str
@@ -77,6 +134,38 @@ class ConversationMeta:
     }
 
 
+@dataclass(slots=True)
+class ProjectStats:
+  """Running per-project totals, folded one ConversationMeta at a time."""
+
+  conversations: int = 0
+  messages: int = 0
+  user_messages: int = 0
+  assistant_messages: int = 0
+  first_activity: Optional[datetime] = None
+  last_activity: Optional[datetime] = None
+
+  def add(self, m: ConversationMeta) -> None:
+    self.conversations += 1
+    self.messages += m.message_count
+    self.user_messages += m.user_count
+    self.assistant_messages += m.assistant_count
+    if m.started and (self.first_activity is None or m.started < self.first_activity):
+      self.first_activity = m.started
+    if m.last_activity and (self.last_activity is None or m.last_activity > self.last_activity):
+      self.last_activity = m.last_activity
+
+  def to_dict(self) -> dict[str, Any]:
+    return {
+      "conversations": self.conversations,
+      "messages": self.messages,
+      "user_messages": self.user_messages,
+      "assistant_messages": self.assistant_messages,
+      "first_activity": self.first_activity.isoformat() if self.first_activity else None,
+      "last_activity": self.last_activity.isoformat() if self.last_activity else None,
+    }
+
+
 # ──────────────────────────── parsing ────────────────────────────
 
 
@@ -117,27 +206,106 @@ def _make_preview(text: str, length: int = PREVIEW_LEN) -> str:
   return collapsed[: length - 1].rstrip() + "…"
 
 
+@dataclass(slots=True)
+class ParseCheckpoint:
+  """Where a metadata scan stopped, so an appended file can be resumed.
+
+  offset always sits just past a newline. tail holds the bytes right
+  before it — if they no longer match, the file was rewritten rather
+  than appended to and we start over.
+  """
+
+  offset: int = 0
+  line_no: int = 0
+  saw_cwd: bool = False
+  tail: bytes = b""
+
+
+# Bytes of the last complete line kept in ParseCheckpoint.tail.
+CHECKPOINT_TAIL_LEN = 64
+
+
+def open_jsonl(path: Path) -> BinaryIO:
+  """Open a session for binary reading, decompressing an archive on the fly."""
+  opener = ARCHIVE_CODECS.get(path.suffix)
+  return opener(path, "rb") if opener else path.open("rb")
+
+
+def session_id_of(path: Path) -> str:
+  """The session id a JSONL path names, archived or not."""
+  return Path(path.stem).stem if path.suffix in ARCHIVE_CODECS else path.stem
+
+
 def parse_metadata(path: Path) -> ConversationMeta:
   """Parse a JSONL file into a ConversationMeta.
 
   Reads the whole file but never retains message bodies, so memory stays
   flat regardless of conversation length.
   """
-  meta = ConversationMeta(
-    session_id=path.stem,
-    path=path,
-    project_path=path.parent.name,  # fallback; overwritten when cwd seen
-  )
+  meta, _ = resume_metadata(path)
+  return meta
+
+
+def resume_metadata(
+  path: Path,
+  meta: Optional[ConversationMeta] = None,
+  checkpoint: Optional[ParseCheckpoint] = None,
+) -> tuple[ConversationMeta, Optional[ParseCheckpoint]]:
+  """Continue a metadata scan from checkpoint, decoding only new lines.
 
-  saw_cwd = False
-  with path.open("r", encoding="utf-8") as f:
-    for line_no, line in enumerate(f, 1):
-      line = line.strip()
+  meta must be the result of the scan that produced checkpoint; it is
+  updated in place. With no checkpoint (or one that no longer matches
+  the file) this is a full parse.
+
+  Returns the checkpoint to resume from next time, or None when the file
+  ends mid-line — a writer is part-way through an append, so the next
+  scan has to start from scratch to pick that line up exactly once.
+  """
+  with open_jsonl(path) as f:
+    if checkpoint is not None and not _tail_matches(f, checkpoint.offset, checkpoint.tail):
+      checkpoint = None
+    if checkpoint is None or meta is None:
+      checkpoint = ParseCheckpoint()
+      meta = ConversationMeta(
+        session_id=session_id_of(path),
+        path=path,
+        project_path=path.parent.name,  # fallback; overwritten when cwd seen
+      )
+      f.seek(0)
+
+    offset, line_no, saw_cwd, tail = (
+      checkpoint.offset,
+      checkpoint.line_no,
+      checkpoint.saw_cwd,
+      checkpoint.tail,
+    )
+    complete = True
+    for raw in f:
+      line_no += 1
+      complete = raw.endswith(b"\n")
+      if complete:
+        offset += len(raw)
+        tail = raw[-CHECKPOINT_TAIL_LEN:]
+      line = raw.strip()
       if not line:
         continue
+
+      # Most bytes in a session are tool results and images we never
+      # look at. Once the project path is known, pull the few fields we
+      # count from the raw line and only decode when that's ambiguous.
+      if complete and (saw_cwd or line_no > CWD_SNIFF_LINES):
+        sniffed = _sniff_entry(line)
+        if sniffed is SNIFF_SKIP:
+          continue
+        if sniffed is not None:
+          etype, timestamp, role = sniffed
+          if not (role == "user" and meta.first_user_preview is None):
+            _count_message(meta, timestamp, role)
+            continue
+
       try:
         entry = json.loads(line)
-      except json.JSONDecodeError:
+      except ValueError:
         continue
 
       # Real project path comes from the cwd field on any entry that
@@ -149,37 +317,163 @@ def parse_metadata(path: Path) -> ConversationMeta:
           meta.project_path = _humanise_path(cwd)
           saw_cwd = True
 
-      etype = entry.get("type")
+      _absorb_entry(meta, entry)
 
-      if etype == "summary":
-        meta.summary = entry.get("summary") or meta.summary
-        continue
+  if not complete:
+    return meta, None
+  return meta, ParseCheckpoint(offset=offset, line_no=line_no, saw_cwd=saw_cwd, tail=tail)
 
-      if etype not in ("user", "assistant"):
-        continue
-      if entry.get("isMeta"):
-        continue  # slash-command docs, system context
 
-      ts = _parse_timestamp(entry.get("timestamp"))
-      if ts is None:
+def _tail_matches(f: Any, offset: int, tail: bytes) -> bool:
+  """Check the bytes before offset are still tail, leaving f at offset.
+
+  This is how an append is told apart from a rewrite: appends never touch
+  bytes that were already there.
+  """
+  if not offset:
+    f.seek(0)
+    return True
+  f.seek(offset - len(tail))
+  return f.read(len(tail)) == tail
+
+
+def peek_started(path: Path) -> Optional[datetime]:
+  """The `started` parse_metadata would report, reading only the head.
+
+  Stops at the first counted message — usually a few lines in — instead
+  of scanning the whole session.
+  """
+  with open_jsonl(path) as f:
+    for raw in f:
+      line = raw.strip()
+      if not line:
         continue
-      if meta.started is None:
-        meta.started = ts
-      meta.last_activity = ts
-
-      meta.message_count += 1
-      role = entry.get("message", {}).get("role", etype)
-      if role == "user":
-        meta.user_count += 1
-        if meta.first_user_preview is None:
-          text = _extract_text(entry.get("message", {}).get("content", ""))
-          preview = _make_preview(text)
-          if preview:
-            meta.first_user_preview = preview
-      elif role == "assistant":
-        meta.assistant_count += 1
+      sniffed = _sniff_entry(line) if raw.endswith(b"\n") else None
+      if sniffed is SNIFF_SKIP:
+        continue
+      if sniffed is not None:
+        timestamp = sniffed[1]
+      else:
+        try:
+          entry = json.loads(line)
+        except ValueError:
+          continue
+        if entry.get("type") not in ("user", "assistant") or entry.get("isMeta"):
+          continue
+        timestamp = entry.get("timestamp")
+      ts = _parse_timestamp(timestamp)
+      if ts is not None:
+        return ts
+  return None
+
+
+SNIFF_SKIP = object()
+
+
+def _sniff_entry(line: bytes) -> Any:
+  """Read type/timestamp/role off a raw JSONL line without decoding it.
+
+  Returns SNIFF_SKIP when the entry can't be a user/assistant/summary
+  entry, (type, timestamp, role) when every field is unambiguous, and
+  None when the caller has to fall back to json.loads. Only ever called
+  on complete lines, so truncated JSON never reaches it.
+
+  A lone timestamp only counts as the entry's own when it is provably
+  top-level (see _top_level_member). One nested in, say, a tool_use
+  input would otherwise pass for the timestamp of an entry that has none.
+  """
+  types: list[bytes] = []
+  stamps: list[bytes] = []
+  roles: list[bytes] = []
+  for key, value, other in SNIFF_RE.findall(line):
+    if other or key == b"isMeta":
+      return None
+    if key == b"type":
+      types.append(value)
+    elif key == b"timestamp":
+      stamps.append(value)
+    else:
+      roles.append(value)
+
+  if b"summary" in types:
+    return None
+  entry_types = [t for t in types if t in (b"user", b"assistant")]
+  if not entry_types:
+    # No user/assistant type anywhere, so the top-level one isn't either.
+    return SNIFF_SKIP
+  if len(entry_types) > 1 or len(stamps) > 1 or len(roles) > 1:
+    return None
+  if stamps and not _top_level_member(line, line.rfind(b'"timestamp"'), b'"' + stamps[0] + b'"'):
+    return None
+  if any(t not in NESTED_TYPES for t in types if t is not entry_types[0]):
+    return None  # possibly a user message nested in some other entry type
+  etype = entry_types[0].decode()
+  timestamp = stamps[0].decode() if stamps else None
+  role = roles[0].decode() if roles else etype
+  return etype, timestamp, role
+
+
+def _top_level_member(line: bytes, start: int, value: bytes) -> bool:
+  """Is the member keyed at line[start:], valued value, in the outermost object?
+
+  Yes if no object opens before it but the line's own, or if what follows
+  it is the rest of one object: `{` plus that decodes exactly. Were the
+  member nested, the same bytes would close its object early and leave
+  extra data. Entries usually end with their timestamp or put only
+  toolUseResult after it, so this never decodes the message ahead of it.
+  """
+  if line.find(b"{", 1, start) == -1:
+    return True
+  rest = line[line.find(value, start) + len(value) :].lstrip()
+  if rest == b"}":
+    return True
+  if not rest.startswith(b","):
+    return False
+  try:
+    json.loads(b"{" + rest[1:])
+  except ValueError:
+    return False
+  return True
 
-  return meta
+
+def _absorb_entry(meta: ConversationMeta, entry: dict[str, Any]) -> None:
+  """Fold one decoded JSONL entry into meta's counters."""
+  etype = entry.get("type")
+
+  if etype == "summary":
+    meta.summary = entry.get("summary") or meta.summary
+    return
+
+  if etype not in ("user", "assistant"):
+    return
+  if entry.get("isMeta"):
+    return  # slash-command docs, system context
+
+  role = entry.get("message", {}).get("role", etype)
+  if not _count_message(meta, entry.get("timestamp"), role):
+    return
+  if role == "user" and meta.first_user_preview is None:
+    text = _extract_text(entry.get("message", {}).get("content", ""))
+    preview = _make_preview(text)
+    if preview:
+      meta.first_user_preview = preview
+
+
+def _count_message(meta: ConversationMeta, timestamp: Optional[str], role: str) -> bool:
+  """Count one user/assistant message; False if it has no usable timestamp."""
+  ts = _parse_timestamp(timestamp)
+  if ts is None:
+    return False
+  if meta.started is None:
+    meta.started = ts
+  meta.last_activity = ts
+
+  meta.message_count += 1
+  if role == "user":
+    meta.user_count += 1
+  elif role == "assistant":
+    meta.assistant_count += 1
+  return True
 
 
 def _humanise_path(cwd: str) -> str:
@@ -192,6 +486,476 @@ def _humanise_path(cwd: str) -> str:
   return cwd
 
 
+# ──────────────────────────── index ────────────────────────────
+
+
+class MetaIndex:
+  """SQLite cache of ConversationMeta keyed by file path, size and mtime.
+
+  A cached row is only trusted while the file's size and mtime_ns still
+  match what was recorded. Files that changed are resumed from their
+  stored ParseCheckpoint when they were only appended to, and re-parsed
+  otherwise. The cache is disposable — delete the file and it rebuilds
+  on next run.
+  """
+
+  SCHEMA_VERSION = 3
+  _COLUMNS = (
+    "session_id",
+    "project_path",
+    "started",
+    "last_activity",
+    "message_count",
+    "user_count",
+    "assistant_count",
+    "summary",
+    "first_user_preview",
+  )
+
+  def __init__(self, db_path: Path):
+    self.db_path = db_path
+    self.conn = sqlite3.connect(db_path, timeout=5.0)
+    self._ensure_schema()
+
+  def _ensure_schema(self) -> None:
+    (version,) = self.conn.execute("PRAGMA user_version").fetchone()
+    if version == self.SCHEMA_VERSION:
+      # Up to date: opening stays read-only, so it never waits on a writer.
+      return
+    # Cache only — a schema change just means a rebuild.
+    for table in ("meta", "term_files", "terms"):
+      self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+    self.conn.execute(
+      """
+      CREATE TABLE IF NOT EXISTS meta (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        session_id TEXT NOT NULL,
+        project_path TEXT NOT NULL,
+        started TEXT,
+        last_activity TEXT,
+        message_count INTEGER NOT NULL,
+        user_count INTEGER NOT NULL,
+        assistant_count INTEGER NOT NULL,
+        summary TEXT,
+        first_user_preview TEXT,
+        resume_offset INTEGER,
+        resume_line_no INTEGER,
+        resume_saw_cwd INTEGER,
+        resume_tail BLOB
+      )
+      """
+    )
+    # Term index: which files mention which words. term_files tracks how
+    # far into each file the terms have been collected.
+    self.conn.execute(
+      """
+      CREATE TABLE IF NOT EXISTS term_files (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        resume_offset INTEGER NOT NULL,
+        resume_tail BLOB NOT NULL
+      )
+      """
+    )
+    self.conn.execute(
+      """
+      CREATE TABLE IF NOT EXISTS terms (
+        token TEXT NOT NULL,
+        path TEXT NOT NULL,
+        PRIMARY KEY (token, path)
+      ) WITHOUT ROWID
+      """
+    )
+    self.conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+    self.conn.commit()
+
+  @staticmethod
+  def _key(path: Path) -> str:
+    return os.path.abspath(path)
+
+  def fetch(
+    self, path: Path
+  ) -> Optional[tuple[int, int, ConversationMeta, Optional[ParseCheckpoint]]]:
+    """Return (size, mtime_ns, meta, checkpoint) as last stored for path."""
+    row = self.conn.execute(
+      f"SELECT size, mtime_ns, {', '.join(self._COLUMNS)}, "
+      "resume_offset, resume_line_no, resume_saw_cwd, resume_tail "
+      "FROM meta WHERE path = ?",
+      (self._key(path),),
+    ).fetchone()
+    if row is None:
+      return None
+    n = len(self._COLUMNS)
+    fields = dict(zip(self._COLUMNS, row[2 : 2 + n]))
+    for key in ("started", "last_activity"):
+      if fields[key]:
+        fields[key] = datetime.fromisoformat(fields[key])
+    offset, line_no, saw_cwd, tail = row[2 + n :]
+    checkpoint = None
+    if offset is not None:
+      checkpoint = ParseCheckpoint(offset, line_no, bool(saw_cwd), tail)
+    return row[0], row[1], ConversationMeta(path=path, **fields), checkpoint
+
+  def store(
+    self,
+    meta: ConversationMeta,
+    st: os.stat_result,
+    checkpoint: Optional[ParseCheckpoint] = None,
+  ) -> None:
+    values = (
+      meta.session_id,
+      meta.project_path,
+      meta.started.isoformat() if meta.started else None,
+      meta.last_activity.isoformat() if meta.last_activity else None,
+      meta.message_count,
+      meta.user_count,
+      meta.assistant_count,
+      meta.summary,
+      meta.first_user_preview,
+    )
+    resume = (None, None, None, None)
+    if checkpoint is not None:
+      resume = (checkpoint.offset, checkpoint.line_no, int(checkpoint.saw_cwd), checkpoint.tail)
+    self.conn.execute(
+      f"INSERT OR REPLACE INTO meta (path, size, mtime_ns, {', '.join(self._COLUMNS)}, "
+      "resume_offset, resume_line_no, resume_saw_cwd, resume_tail) "
+      f"VALUES ({', '.join('?' * (len(self._COLUMNS) + 7))})",
+      (self._key(meta.path), st.st_size, st.st_mtime_ns, *values, *resume),
+    )
+
+  def fetch_terms_state(self, path: Path) -> Optional[tuple[int, int, int, bytes]]:
+    """Return (size, mtime_ns, offset, tail) for path's indexed terms."""
+    return self.conn.execute(
+      "SELECT size, mtime_ns, resume_offset, resume_tail FROM term_files WHERE path = ?",
+      (self._key(path),),
+    ).fetchone()
+
+  def store_terms(
+    self,
+    path: Path,
+    st: os.stat_result,
+    terms: Iterable[str],
+    offset: int,
+    tail: bytes,
+    replace: bool,
+  ) -> None:
+    """Record terms for path. replace drops what was indexed before."""
+    key = self._key(path)
+    if replace:
+      self.conn.execute("DELETE FROM terms WHERE path = ?", (key,))
+    self.conn.executemany(
+      "INSERT OR IGNORE INTO terms (token, path) VALUES (?, ?)",
+      ((t, key) for t in terms),
+    )
+    self.conn.execute(
+      "INSERT OR REPLACE INTO term_files (path, size, mtime_ns, resume_offset, resume_tail) "
+      "VALUES (?, ?, ?, ?, ?)",
+      (key, st.st_size, st.st_mtime_ns, offset, tail),
+    )
+
+  def rename(
+    self, old: Path, new: Path, old_st: os.stat_result, new_st: os.stat_result
+  ) -> None:
+    """Move old's rows to new, which holds the same JSONL under another name.
+
+    Only rows still fresh for old_st move over; stale ones are dropped and
+    rebuilt from new when next needed.
+    """
+    src, dst = self._key(old), self._key(new)
+    for table in ("meta", "term_files"):
+      self.conn.execute(f"DELETE FROM {table} WHERE path = ?", (dst,))
+      self.conn.execute(
+        f"UPDATE {table} SET path = ?, size = ?, mtime_ns = ? "
+        "WHERE path = ? AND size = ? AND mtime_ns = ?",
+        (dst, new_st.st_size, new_st.st_mtime_ns, src, old_st.st_size, old_st.st_mtime_ns),
+      )
+      self.conn.execute(f"DELETE FROM {table} WHERE path = ?", (src,))
+    self.conn.execute("DELETE FROM terms WHERE path = ?", (dst,))
+    if self.conn.execute("SELECT 1 FROM term_files WHERE path = ?", (dst,)).fetchone():
+      self.conn.execute("UPDATE terms SET path = ? WHERE path = ?", (dst, src))
+    else:
+      self.conn.execute("DELETE FROM terms WHERE path = ?", (src,))
+
+  def paths_with_token(self, token: str) -> set[str]:
+    """Index keys of files containing token; a trailing * matches a prefix."""
+    if token.endswith("*"):
+      prefix = token[:-1]
+      rows = self.conn.execute(
+        "SELECT DISTINCT path FROM terms WHERE token >= ? AND token < ?",
+        (prefix, prefix + "\U0010ffff"),
+      )
+    else:
+      rows = self.conn.execute("SELECT path FROM terms WHERE token = ?", (token,))
+    return {path for (path,) in rows}
+
+  def commit(self) -> None:
+    self.conn.commit()
+
+  def close(self) -> None:
+    self.conn.commit()
+    self.conn.close()
+
+
+def open_index(db_path: Optional[Path]) -> Optional[MetaIndex]:
+  """Open the metadata index, or None if disabled or unusable.
+
+  A broken or unwritable cache must never stop a query — we just fall
+  back to parsing every file.
+  """
+  if db_path is None:
+    return None
+  try:
+    return MetaIndex(db_path)
+  except (sqlite3.Error, OSError) as e:
+    print(f"warning: metadata index disabled ({db_path}: {e})", file=sys.stderr)
+    return None
+
+
+def index_write(index: MetaIndex, write: Any, *args: Any) -> Optional[MetaIndex]:
+  """write(*args), returning index — or None once a write fails.
+
+  Same promise as open_index, for a cache that goes bad mid-run (most
+  often another process holding the lock): warn, roll back, and let the
+  caller carry on without it.
+  """
+  try:
+    write(*args)
+    return index
+  except sqlite3.Error as e:
+    print(f"warning: metadata index disabled ({index.db_path}: {e})", file=sys.stderr)
+    try:
+      index.conn.rollback()
+    except sqlite3.Error:
+      pass
+    return None
+
+
+def load_metadata(
+  paths: Iterable[Path],
+  index: Optional[MetaIndex] = None,
+  jobs: int = 1,
+) -> list[ConversationMeta]:
+  """All of iter_metadata at once."""
+  metas = iter_metadata(paths, index, jobs)
+  try:
+    return list(metas)
+  finally:
+    metas.close()
+
+
+def iter_metadata(
+  paths: Iterable[Path],
+  index: Optional[MetaIndex] = None,
+  jobs: int = 1,
+) -> Iterator[ConversationMeta]:
+  """parse_metadata over paths, served from the index where still fresh.
+
+  Files that grew since they were indexed (live sessions) are resumed
+  from their checkpoint, so only the appended lines get decoded. What
+  is left to parse is fanned out over `jobs` processes.
+
+  Yields in path order as each batch completes, so consumers can start
+  before the whole corpus is parsed — file by file when jobs is 1.
+  Index writes are committed after a batch once INDEX_COMMIT_SECONDS
+  have passed, so other processes never wait long on the lock. Close the
+  generator when stopping early so the last ones get committed.
+  """
+  batch_size = 1 if jobs <= 1 else jobs * METADATA_BATCH_PER_JOB
+  pool: Optional[ProcessPoolExecutor] = None
+  committed = time.monotonic()
+  try:
+    for batch in _batched(paths, batch_size):
+      metas: list[Optional[ConversationMeta]] = [None] * len(batch)
+      todo: list[tuple[int, Optional[os.stat_result]]] = []
+      seeds: list[Optional[ConversationMeta]] = []
+      checkpoints: list[Optional[ParseCheckpoint]] = []
+      for i, p in enumerate(batch):
+        st, meta, checkpoint = None, None, None
+        if index is not None:
+          st = p.stat()
+          cached = index.fetch(p)
+          if cached is not None and cached[:2] == (st.st_size, st.st_mtime_ns):
+            metas[i] = cached[2]
+            continue
+          if cached is not None and cached[3] is not None and st.st_size >= cached[3].offset:
+            meta, checkpoint = cached[2], cached[3]
+        todo.append((i, st))
+        seeds.append(meta)
+        checkpoints.append(checkpoint)
+
+      if pool is None and jobs > 1 and len(todo) >= PARALLEL_MIN_FILES:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+      todo_paths = [batch[i] for i, _ in todo]
+      results = _pool_map(resume_metadata, todo_paths, seeds, checkpoints, jobs=jobs, pool=pool)
+      for (i, st), (meta, checkpoint) in zip(todo, results):
+        metas[i] = meta
+        if index is not None:
+          index = index_write(index, index.store, meta, st, checkpoint)
+      if index is not None and todo and time.monotonic() - committed >= INDEX_COMMIT_SECONDS:
+        index = index_write(index, index.commit)
+        committed = time.monotonic()
+      yield from metas
+  finally:
+    if pool is not None:
+      pool.shutdown(cancel_futures=True)
+    if index is not None:
+      index_write(index, index.commit)
+
+
+def _batched(items: Iterable[Any], n: int) -> Iterator[list[Any]]:
+  it = iter(items)
+  while batch := list(islice(it, n)):
+    yield batch
+
+
+def _pool_map(
+  fn: Any,
+  *iterables: list[Any],
+  jobs: int = 1,
+  pool: Optional[ProcessPoolExecutor] = None,
+) -> Iterator[Any]:
+  """map(fn, *iterables) in a process pool when the batch is big enough.
+
+  Parsing is CPU-bound on json.loads, so threads won't help. Work is
+  handed out in chunks to keep pickling overhead per file low. Results
+  come back in input order. Pass pool to reuse one across batches.
+  """
+  n = len(iterables[0])
+  if jobs <= 1 or n < PARALLEL_MIN_FILES:
+    yield from map(fn, *iterables)
+    return
+  jobs = min(jobs, n)
+  chunksize = max(1, n // (jobs * 4))
+  if pool is not None:
+    yield from pool.map(fn, *iterables, chunksize=chunksize)
+    return
+  with ProcessPoolExecutor(max_workers=jobs) as own_pool:
+    yield from own_pool.map(fn, *iterables, chunksize=chunksize)
+
+
+# ──────────────────────────── term index ────────────────────────────
+
+
+def _entry_terms(entry: dict[str, Any]) -> Iterator[str]:
+  """Words from a user/assistant entry's text blocks, plus tool names."""
+  if entry.get("type") not in ("user", "assistant"):
+    return
+  content = entry.get("message", {}).get("content", "")
+  if isinstance(content, str):
+    yield from TERM_RE.findall(content.lower())
+    return
+  if not isinstance(content, list):
+    return
+  for block in content:
+    if not isinstance(block, dict):
+      continue
+    if block.get("type") == "text":
+      yield from TERM_RE.findall(block.get("text", "").lower())
+    elif block.get("type") == "tool_use":
+      yield from TERM_RE.findall(block.get("name", "").lower())
+
+
+def extract_terms(path: Path, offset: int = 0, tail: bytes = b"") -> tuple[set[str], int, bytes, bool]:
+  """Collect index terms from path, starting at offset when tail still matches.
+
+  Returns (terms, new_offset, new_tail, resumed). resumed is False when
+  the file was rewritten and the scan restarted from byte 0 — the
+  caller must then drop the file's old terms. A trailing partial line is
+  read but not consumed; adding its terms again later is harmless since
+  the index is a set.
+  """
+  terms: set[str] = set()
+  with open_jsonl(path) as f:
+    resumed = _tail_matches(f, offset, tail)
+    if not resumed:
+      offset, tail = 0, b""
+      f.seek(0)
+    for raw in f:
+      if raw.endswith(b"\n"):
+        offset += len(raw)
+        tail = raw[-CHECKPOINT_TAIL_LEN:]
+      line = raw.strip()
+      if not line or (raw.endswith(b"\n") and _sniff_entry(line) is SNIFF_SKIP):
+        continue
+      try:
+        entry = json.loads(line)
+      except ValueError:
+        continue
+      terms.update(_entry_terms(entry))
+  return terms, offset, tail, resumed
+
+
+def refresh_terms(paths: list[Path], index: MetaIndex, jobs: int = 1) -> Optional[MetaIndex]:
+  """Bring the term index up to date for paths, scanning only what changed.
+
+  Returns index, or None if it couldn't be written (see index_write).
+  """
+  todo: list[tuple[Path, os.stat_result]] = []
+  offsets: list[int] = []
+  tails: list[bytes] = []
+  for p in paths:
+    st = p.stat()
+    state = index.fetch_terms_state(p)
+    if state is not None and state[:2] == (st.st_size, st.st_mtime_ns):
+      continue
+    todo.append((p, st))
+    offsets.append(state[2] if state is not None else 0)
+    tails.append(state[3] if state is not None else b"")
+  results = _pool_map(extract_terms, [p for p, _ in todo], offsets, tails, jobs=jobs)
+  committed = time.monotonic()
+  for (p, st), (terms, offset, tail, resumed) in zip(todo, results):
+    if index_write(index, index.store_terms, p, st, terms, offset, tail, not resumed) is None:
+      return None
+    if time.monotonic() - committed >= INDEX_COMMIT_SECONDS:
+      if index_write(index, index.commit) is None:
+        return None
+      committed = time.monotonic()
+  return index_write(index, index.commit)
+
+
+def query_terms(paths: list[Path], index: MetaIndex, terms: list[str], match_any: bool) -> list[Path]:
+  """Paths (in input order) whose indexed words match terms.
+
+  Each term is tokenised like the text it is matched against, so a
+  multi-word term needs all its words. A term with no indexable word
+  (`c++`, `x`, `->`) falls back to a raw scan, of only the files that
+  could still change the result. Terms combine with AND, or OR when
+  match_any.
+  """
+  keys = {MetaIndex._key(p): p for p in paths}
+  hits: Optional[set[str]] = None
+  raw: list[str] = []
+  for term in terms:
+    words = TERM_RE.findall(term.lower())
+    if not words:
+      raw.append(term.removesuffix("*"))
+      continue
+    if term.endswith("*"):
+      words[-1] += "*"
+    term_hits = set(keys)
+    for word in words:
+      term_hits &= index.paths_with_token(word)
+    if hits is None:
+      hits = term_hits
+    elif match_any:
+      hits |= term_hits
+    else:
+      hits &= term_hits
+  for term in raw:
+    if hits is None:
+      hits = {MetaIndex._key(p) for p in search_paths(paths, term)}
+    elif match_any:
+      rest = [p for k, p in keys.items() if k not in hits]
+      hits |= {MetaIndex._key(p) for p in search_paths(rest, term)}
+    else:
+      kept = [p for k, p in keys.items() if k in hits]
+      hits = {MetaIndex._key(p) for p in search_paths(kept, term)}
+  return [p for k, p in keys.items() if k in (hits or set())]
+
+
 # ──────────────────────────── discovery ────────────────────────────
 
 
@@ -200,7 +964,7 @@ def iter_jsonl_paths(
   project_filter: Optional[str] = None,
   include_subagents: bool = False,
 ) -> Iterator[Path]:
-  """Yield every top-level JSONL under projects_dir.
+  """Yield every top-level JSONL under projects_dir, archived ones included.
 
   project_filter is a case-insensitive substring match against the
   encoded directory name (a rough proxy for project path).
@@ -217,9 +981,10 @@ def iter_jsonl_paths(
       continue
     if needle and needle not in proj_dir.name.lower():
       continue
-    yield from proj_dir.glob("*.jsonl")
-    if include_subagents:
-      yield from proj_dir.glob("*/subagents/*.jsonl")
+    for suffix in SESSION_SUFFIXES:
+      yield from proj_dir.glob(f"*{suffix}")
+      if include_subagents:
+        yield from proj_dir.glob(f"*/subagents/*{suffix}")
 
 
 def paths_by_mtime(paths: Iterable[Path], newest_first: bool = True) -> list[Path]:
@@ -229,8 +994,11 @@ def paths_by_mtime(paths: Iterable[Path], newest_first: bool = True) -> list[Pat
 
 def find_by_session_id(projects_dir: Path, session_id: str) -> Optional[Path]:
   """Locate the JSONL for a given session id by filename, no parsing."""
-  matches = list(projects_dir.glob(f"*/{session_id}.jsonl"))
-  return matches[0] if matches else None
+  for suffix in SESSION_SUFFIXES:
+    matches = list(projects_dir.glob(f"*/{session_id}{suffix}"))
+    if matches:
+      return matches[0]
+  return None
 
 
 # ──────────────────────────── filtering ────────────────────────────
@@ -247,6 +1015,41 @@ def _parse_date(s: Optional[str]) -> Optional[datetime]:
   return dt
 
 
+def date_candidates(
+  paths: Iterable[Path],
+  since: Optional[datetime] = None,
+  until: Optional[datetime] = None,
+  index: Optional[MetaIndex] = None,
+) -> list[tuple[Path, datetime]]:
+  """(path, started) for paths that can pass since/until, without full parses.
+
+  A file is only ever appended to, so its mtime is at or after its first
+  message: anything last written before `since` is dropped on a stat
+  alone. The rest get `started` from a fresh index row or a head-only
+  read. Same verdicts as apply_filters, including dropping sessions
+  with no messages.
+  """
+  out: list[tuple[Path, datetime]] = []
+  for p in paths:
+    st = p.stat()
+    if since and datetime.fromtimestamp(st.st_mtime, timezone.utc) + MTIME_SLACK < since:
+      continue
+    started = None
+    cached = index.fetch(p) if index is not None else None
+    if cached is not None and cached[:2] == (st.st_size, st.st_mtime_ns):
+      started = cached[2].started
+    else:
+      started = peek_started(p)
+    if started is None:
+      continue
+    if since and started < since:
+      continue
+    if until and started > until:
+      continue
+    out.append((p, started))
+  return out
+
+
 def apply_filters(
   metas: Iterable[ConversationMeta],
   *,
@@ -268,6 +1071,27 @@ def apply_filters(
     yield m
 
 
+def aggregate_by_project(
+  metas: Iterable[ConversationMeta],
+) -> tuple[ProjectStats, list[tuple[str, ProjectStats]]]:
+  """Fold metas into overall and per-project totals in a single pass.
+
+  Only the running totals are kept, so memory grows with the number of
+  projects rather than sessions. Projects come back busiest first (by
+  message count), ties in order of first appearance.
+  """
+  total = ProjectStats()
+  by_project: dict[str, ProjectStats] = {}
+  for m in metas:
+    total.add(m)
+    proj = by_project.get(m.project_path)
+    if proj is None:
+      proj = by_project[m.project_path] = ProjectStats()
+    proj.add(m)
+  rows = sorted(by_project.items(), key=lambda kv: kv[1].messages, reverse=True)
+  return total, rows
+
+
 # ──────────────────────────── rendering ────────────────────────────
 
 
@@ -278,6 +1102,8 @@ def auto_format(explicit: Optional[str]) -> str:
 
 
 def render_list(metas: list[ConversationMeta], fmt: str) -> str:
+  if fmt == "ndjson":
+    return "\n".join(_ndjson_line(m) for m in metas)
   if fmt == "json":
     return json.dumps(
       {"total": len(metas), "conversations": [m.to_dict() for m in metas]},
@@ -296,6 +1122,58 @@ def render_list(metas: list[ConversationMeta], fmt: str) -> str:
   return _render_list_text(metas)
 
 
+def _ndjson_line(meta: ConversationMeta) -> str:
+  return json.dumps(meta.to_dict(), ensure_ascii=False)
+
+
+def emit_list(
+  metas: Iterable[ConversationMeta],
+  args: argparse.Namespace,
+  empty_message: Optional[str] = None,
+) -> int:
+  """Sort, limit and print list-shaped results for list and search.
+
+  With --unsorted, results keep discovery order; --paths-only and
+  ndjson output are then printed as each conversation is parsed instead
+  of after the whole corpus. Returns the number of conversations shown.
+  """
+  fmt = auto_format(args.format)
+  if args.unsorted:
+    if args.limit:
+      metas = islice(metas, args.limit)
+    if args.paths_only or fmt == "ndjson":
+      count = 0
+      for m in metas:
+        print(m.path if args.paths_only else _ndjson_line(m), flush=True)
+        count += 1
+      if not count and empty_message:
+        print(empty_message, file=sys.stderr)
+      return count
+    shown = list(metas)
+  else:
+    shown = sorted(
+      metas,
+      key=lambda m: m.started or datetime.min.replace(tzinfo=timezone.utc),
+      reverse=True,
+    )
+    if args.limit:
+      shown = shown[: args.limit]
+
+  if not shown and empty_message:
+    print(empty_message, file=sys.stderr)
+    return 0
+
+  if args.paths_only:
+    for m in shown:
+      print(m.path)
+    return len(shown)
+
+  rendered = render_list(shown, fmt)
+  if rendered:
+    print(rendered)
+  return len(shown)
+
+
 def _render_list_text(metas: list[ConversationMeta]) -> str:
   if not metas:
     return "(no conversations)"
@@ -367,46 +1245,95 @@ def search_paths(
   needle = term.encode("utf-8") if case_sensitive else term.lower().encode("utf-8")
   for path in paths:
     try:
-      with path.open("rb") as f:
-        haystack = f.read()
+      if _file_contains(path, needle, case_sensitive):
+        yield path
     except OSError:
       continue
-    if not case_sensitive:
-      haystack = haystack.lower()
-    if needle in haystack:
-      yield path
+
+
+def _file_contains(path: Path, needle: bytes, case_sensitive: bool) -> bool:
+  """Scan path in SEARCH_CHUNK blocks, stopping at the first hit.
+
+  Consecutive blocks overlap by len(needle) - 1 bytes so a match that
+  straddles a boundary is still found. Case folding is bytes.lower() —
+  ASCII only, same as folding the whole file — applied per block, so
+  peak memory is a couple of blocks regardless of file size.
+  """
+  if not needle:
+    return True
+  keep = len(needle) - 1
+  carry = b""
+  with open_jsonl(path) as f:
+    while block := f.read(SEARCH_CHUNK):
+      if not case_sensitive:
+        block = block.lower()
+      window = carry + block if carry else block
+      if needle in window:
+        return True
+      carry = window[len(window) - keep :] if keep else b""
+  return False
+
+
+# ──────────────────────────── archive ────────────────────────────
+
+
+def archive_session(
+  path: Path, codec: str, index: Optional[MetaIndex] = None, force: bool = False
+) -> Optional[Path]:
+  """Compress path into path + codec beside it, then remove the original.
+
+  The archive keeps the original's mtime, so mtime pruning in
+  date_candidates still holds, and fresh index rows move over to it.
+  Returns None, leaving path alone, if it changed while being compressed.
+  Raises FileExistsError if the archive already exists, unless force.
+  """
+  dest = path.with_name(path.name + codec)
+  if dest.exists() and not force:
+    raise FileExistsError(errno.EEXIST, "archive already exists", str(dest))
+  tmp = dest.with_name(dest.name + ".tmp")
+  st = path.stat()
+  try:
+    with path.open("rb") as src, ARCHIVE_CODECS[codec](tmp, "wb") as out:
+      shutil.copyfileobj(src, out, SEARCH_CHUNK)
+    shutil.copystat(path, tmp)
+    now = path.stat()
+    if (now.st_size, now.st_mtime_ns) != (st.st_size, st.st_mtime_ns):
+      tmp.unlink()
+      return None
+    os.replace(tmp, dest)
+  except BaseException:
+    tmp.unlink(missing_ok=True)
+    raise
+  if index is not None and index_write(index, index.rename, path, dest, st, dest.stat()):
+    index_write(index, index.commit)
+  path.unlink()
+  return dest
 
 
 # ──────────────────────────── commands ────────────────────────────
 
 
 def cmd_list(args: argparse.Namespace) -> int:
+  since, until = _parse_date(args.since), _parse_date(args.until)
   paths = iter_jsonl_paths(args.projects_dir, args.project, args.include_subagents)
-  # If limit + no filters that need message counts, we can fast-path:
-  # mtime-sort, parse only the top N.
-  need_parse_all = args.since or args.until or args.min_messages
-  if args.limit and not need_parse_all:
+  if since or until:
+    # Date filters only need `started`: prune by mtime and head reads,
+    # and with a limit (and nothing needing counts) fully parse just the
+    # newest N survivors.
+    candidates = date_candidates(paths, since, until, args.index)
+    if args.limit and not args.min_messages:
+      candidates.sort(key=lambda c: c[1], reverse=True)
+      candidates = candidates[: args.limit]
+    paths = [p for p, _ in candidates]
+  elif args.limit and not args.min_messages:
+    # If limit + no filters that need message counts, we can fast-path:
+    # mtime-sort, parse only the top N.
     paths = paths_by_mtime(paths)[: args.limit]
-  metas = [parse_metadata(p) for p in paths]
-
-  filtered = list(
-    apply_filters(
-      metas,
-      since=_parse_date(args.since),
-      until=_parse_date(args.until),
-      min_messages=args.min_messages,
-    )
-  )
-  filtered.sort(key=lambda m: m.started or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
-  if args.limit:
-    filtered = filtered[: args.limit]
-
-  if args.paths_only:
-    for m in filtered:
-      print(m.path)
-    return 0
-
-  print(render_list(filtered, auto_format(args.format)))
+  metas = iter_metadata(paths, args.index, args.jobs)
+  try:
+    emit_list(apply_filters(metas, since=since, until=until, min_messages=args.min_messages), args)
+  finally:
+    metas.close()
   return 0
 
 
@@ -415,7 +1342,7 @@ def cmd_last(args: argparse.Namespace) -> int:
   if not paths:
     print("No conversations found.", file=sys.stderr)
     return 1
-  meta = parse_metadata(paths[0])
+  (meta,) = load_metadata(paths[:1], args.index)
   if args.path:
     print(meta.path)
     return 0
@@ -428,7 +1355,7 @@ def cmd_get(args: argparse.Namespace) -> int:
   if path is None:
     print(f"No conversation with session id: {args.session_id}", file=sys.stderr)
     return 1
-  meta = parse_metadata(path)
+  (meta,) = load_metadata([path], args.index)
   if args.path:
     print(meta.path)
     return 0
@@ -437,94 +1364,111 @@ def cmd_get(args: argparse.Namespace) -> int:
 
 
 def cmd_search(args: argparse.Namespace) -> int:
-  candidates = iter_jsonl_paths(args.projects_dir, args.project, args.include_subagents)
-  hits = list(search_paths(candidates, args.term, case_sensitive=args.case_sensitive))
-
-  metas = [parse_metadata(p) for p in hits]
-  filtered = list(
-    apply_filters(
-      metas,
-      since=_parse_date(args.since),
-      until=_parse_date(args.until),
+  since, until = _parse_date(args.since), _parse_date(args.until)
+  candidates = list(iter_jsonl_paths(args.projects_dir, args.project, args.include_subagents))
+  if since or until:
+    candidates = [p for p, _ in date_candidates(candidates, since, until, args.index)]
+  index = args.index
+  if args.indexed and index is not None:
+    index = refresh_terms(candidates, index, args.jobs)
+  if args.indexed and index is not None:
+    hits: Iterable[Path] = query_terms(candidates, index, args.terms, args.any)
+  elif args.any:
+    found: set[Path] = set()
+    for term in args.terms:
+      found.update(search_paths(candidates, term, case_sensitive=args.case_sensitive))
+    hits = [p for p in candidates if p in found]
+  else:
+    # Chained generators: each file is checked for every term before the
+    # next one is read, so --unsorted output can start on the first hit.
+    hits = candidates
+    for term in args.terms:
+      hits = search_paths(hits, term, case_sensitive=args.case_sensitive)
+
+  metas = iter_metadata(hits, index, args.jobs)
+  try:
+    emit_list(
+      apply_filters(metas, since=since, until=until),
+      args,
+      empty_message=f"No conversations matching {' '.join(map(repr, args.terms))}.",
     )
-  )
-  filtered.sort(key=lambda m: m.started or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
-  if args.limit:
-    filtered = filtered[: args.limit]
-
-  if not filtered:
-    print(f"No conversations matching '{args.term}'.", file=sys.stderr)
-    return 0
-
-  if args.paths_only:
-    for m in filtered:
-      print(m.path)
-    return 0
-
-  print(render_list(filtered, auto_format(args.format)))
+  finally:
+    metas.close()
   return 0
 
 
 def cmd_stats(args: argparse.Namespace) -> int:
-  metas = [
-    parse_metadata(p)
-    for p in iter_jsonl_paths(args.projects_dir, args.project, args.include_subagents)
-  ]
-  filtered = list(
-    apply_filters(
-      metas,
-      since=_parse_date(args.since),
-      until=_parse_date(args.until),
-    )
-  )
-
-  by_project: dict[str, list[ConversationMeta]] = defaultdict(list)
-  for m in filtered:
-    by_project[m.project_path].append(m)
-
-  total_convs = len(filtered)
-  total_msgs = sum(m.message_count for m in filtered)
+  since, until = _parse_date(args.since), _parse_date(args.until)
+  paths = iter_jsonl_paths(args.projects_dir, args.project, args.include_subagents)
+  if since or until:
+    paths = [p for p, _ in date_candidates(paths, since, until, args.index)]
+  metas = iter_metadata(paths, args.index, args.jobs)
+  try:
+    total, rows = aggregate_by_project(apply_filters(metas, since=since, until=until))
+  finally:
+    metas.close()
 
   if args.format == "json" or (not sys.stdout.isatty() and not args.format):
     payload = {
-      "total_conversations": total_convs,
-      "total_messages": total_msgs,
-      "projects": [
-        {
-          "project": project,
-          "conversations": len(convs),
-          "messages": sum(c.message_count for c in convs),
-        }
-        for project, convs in sorted(
-          by_project.items(),
-          key=lambda kv: sum(c.message_count for c in kv[1]),
-          reverse=True,
-        )
-      ],
+      "total_conversations": total.conversations,
+      "total_messages": total.messages,
+      "total_user_messages": total.user_messages,
+      "total_assistant_messages": total.assistant_messages,
+      "projects": [{"project": project, **stats.to_dict()} for project, stats in rows],
     }
     print(json.dumps(payload, indent=2, ensure_ascii=False))
     return 0
 
   lines = [
-    f"Conversations: {total_convs}",
-    f"Messages:      {total_msgs}",
+    f"Conversations: {total.conversations}",
+    f"Messages:      {total.messages} ({total.user_messages} user, "
+    f"{total.assistant_messages} assistant)",
     "",
-    f"{'project':<50} {'convs':>6} {'msgs':>7}",
-    f"{'-' * 50} {'-' * 6} {'-' * 7}",
+    f"{'project':<50} {'convs':>6} {'msgs':>7} {'last active':>11}",
+    f"{'-' * 50} {'-' * 6} {'-' * 7} {'-' * 11}",
   ]
-  rows = sorted(
-    by_project.items(),
-    key=lambda kv: sum(c.message_count for c in kv[1]),
-    reverse=True,
-  )
-  for project, convs in rows:
-    msgs = sum(c.message_count for c in convs)
+  for project, stats in rows:
     display = project if len(project) <= 50 else "…" + project[-49:]
-    lines.append(f"{display:<50} {len(convs):>6} {msgs:>7}")
+    last = stats.last_activity.strftime("%Y-%m-%d") if stats.last_activity else "?"
+    lines.append(f"{display:<50} {stats.conversations:>6} {stats.messages:>7} {last:>11}")
   print("\n".join(lines))
   return 0
 
 
+def cmd_archive(args: argparse.Namespace) -> int:
+  cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
+  paths = [
+    p
+    for p in iter_jsonl_paths(args.projects_dir, args.project, args.include_subagents)
+    if p.suffix not in ARCHIVE_CODECS
+    and datetime.fromtimestamp(p.stat().st_mtime, timezone.utc) < cutoff
+  ]
+  if args.dry_run:
+    for p in paths:
+      print(p)
+    return 0
+  # Index every session while it is still plain JSONL, so the metadata
+  # carries over and listing archives never has to decompress them.
+  index = args.index
+  if index is not None:
+    load_metadata(paths, index, args.jobs)
+    index = refresh_terms(paths, index, args.jobs)
+  codec = "." + args.codec
+  status = 0
+  for p in paths:
+    try:
+      dest = archive_session(p, codec, index, args.force)
+    except FileExistsError as e:
+      print(f"skipped ({e.filename} exists; --force replaces it): {p}", file=sys.stderr)
+      status = 1
+      continue
+    if dest is None:
+      print(f"skipped (written to while archiving): {p}", file=sys.stderr)
+    else:
+      print(dest)
+  return status
+
+
 # ──────────────────────────── CLI ────────────────────────────
 
 
@@ -540,13 +1484,39 @@ def build_parser() -> argparse.ArgumentParser:
     default=DEFAULT_PROJECTS_DIR,
     help=f"Projects directory (default: {DEFAULT_PROJECTS_DIR})",
   )
+  p.add_argument(
+    "--index",
+    type=Path,
+    help=f"Metadata cache file (default: {INDEX_FILENAME} beside the projects dir)",
+  )
+  p.add_argument(
+    "--no-index", action="store_true", help="Parse every file; don't read or write the cache"
+  )
   sub = p.add_subparsers(dest="command", required=True)
 
-  def add_format(sp: argparse.ArgumentParser) -> None:
-    sp.add_argument("--format", choices=["text", "json", "yaml"], help="Output format (auto)")
+  def add_format(sp: argparse.ArgumentParser, streaming: bool = False) -> None:
+    choices = ["text", "json", "yaml"] + (["ndjson"] if streaming else [])
+    sp.add_argument("--format", choices=choices, help="Output format (auto)")
+
+  def add_unsorted(sp: argparse.ArgumentParser) -> None:
+    sp.add_argument(
+      "--unsorted",
+      action="store_true",
+      help="Keep discovery order; stream --paths-only/ndjson output as files are parsed",
+    )
+
+  def add_jobs(sp: argparse.ArgumentParser) -> None:
+    sp.add_argument(
+      "--jobs",
+      type=int,
+      default=os.cpu_count() or 1,
+      metavar="N",
+      help="Parse files across N processes (default: CPU count)",
+    )
 
   lst = sub.add_parser("list", help="Browse conversations with filters")
-  add_format(lst)
+  add_format(lst, streaming=True)
+  add_unsorted(lst)
   lst.add_argument("--since", help="Filter: started on or after DATE")
   lst.add_argument("--until", help="Filter: started on or before DATE")
   lst.add_argument("--project", help="Substring match against project path")
@@ -556,6 +1526,7 @@ def build_parser() -> argparse.ArgumentParser:
   lst.add_argument(
     "--include-subagents", action="store_true", help="Also catalog subagent sessions"
   )
+  add_jobs(lst)
   lst.set_defaults(func=cmd_list)
 
   last = sub.add_parser("last", help="Most recent session by file mtime")
@@ -572,9 +1543,19 @@ def build_parser() -> argparse.ArgumentParser:
   get.set_defaults(func=cmd_get)
 
   srch = sub.add_parser("search", help="Find conversations whose JSONL contains TERM")
-  add_format(srch)
-  srch.add_argument("term", help="Substring to search for (case-insensitive by default)")
+  add_format(srch, streaming=True)
+  add_unsorted(srch)
+  srch.add_argument(
+    "terms", nargs="+", metavar="term", help="Substring to search for (case-insensitive by default)"
+  )
+  srch.add_argument("--any", action="store_true", help="Match any term instead of all of them")
   srch.add_argument("--case-sensitive", action="store_true")
+  srch.add_argument(
+    "--indexed",
+    action="store_true",
+    help="Match whole words (or word* prefixes) in user/assistant text and tool names "
+    "via the term index instead of scanning raw JSONL",
+  )
   srch.add_argument("--project", help="Restrict to project path substring")
   srch.add_argument("--since", help="Filter: started on or after DATE")
   srch.add_argument("--until", help="Filter: started on or before DATE")
@@ -583,6 +1564,7 @@ def build_parser() -> argparse.ArgumentParser:
   srch.add_argument(
     "--include-subagents", action="store_true", help="Also search subagent sessions"
   )
+  add_jobs(srch)
   srch.set_defaults(func=cmd_search)
 
   stats = sub.add_parser("stats", help="Per-project activity overview")
@@ -593,17 +1575,51 @@ def build_parser() -> argparse.ArgumentParser:
   stats.add_argument(
     "--include-subagents", action="store_true", help="Also count subagent sessions"
   )
+  add_jobs(stats)
   stats.set_defaults(func=cmd_stats)
 
+  arch = sub.add_parser(
+    "archive",
+    help="Compress sessions idle for N days in place (Claude Code can't resume them after)",
+  )
+  arch.add_argument(
+    "--days", type=int, default=30, metavar="N", help="Idle for at least N days (default: 30)"
+  )
+  arch.add_argument(
+    "--codec", choices=["gz", "xz"], default="gz", help="gz is faster, xz smaller (default: gz)"
+  )
+  arch.add_argument("--project", help="Restrict to project path substring")
+  arch.add_argument(
+    "--include-subagents", action="store_true", help="Also archive subagent sessions"
+  )
+  arch.add_argument("--dry-run", action="store_true", help="List what would be archived")
+  arch.add_argument(
+    "--force", action="store_true", help="Replace an existing archive of the same session"
+  )
+  add_jobs(arch)
+  arch.set_defaults(func=cmd_archive)
+
   return p
 
 
 def main(argv: Optional[list[str]] = None) -> int:
-  args = build_parser().parse_args(argv)
+  parser = build_parser()
+  args = parser.parse_args(argv)
+  if getattr(args, "indexed", False):
+    if args.case_sensitive:
+      parser.error("--indexed matches case-insensitively; drop --case-sensitive")
+    if args.no_index:
+      parser.error("--indexed needs the index; drop --no-index")
   if not args.projects_dir.exists():
     print(f"Projects directory not found: {args.projects_dir}", file=sys.stderr)
     return 1
-  return args.func(args)
+  db_path = None if args.no_index else (args.index or args.projects_dir.parent / INDEX_FILENAME)
+  args.index = open_index(db_path)
+  try:
+    return args.func(args)
+  finally:
+    if args.index is not None:
+      args.index.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,49 @@
+"""Regression tests for query_conversations.py. Run: python -m pytest claude/scripts"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import query_conversations as qc
+
+
+def _write_session(path: Path, entries: list[dict]) -> Path:
+  path.write_text("".join(json.dumps(e) + "\n" for e in entries), encoding="utf-8")
+  return path
+
+
+def test_sniff_ignores_nested_timestamp(tmp_path: Path) -> None:
+  # Entry 3 has no timestamp of its own, only one inside a tool_use input:
+  # a full decode doesn't count it, so the raw-line sniff mustn't either.
+  nested = {
+    "type": "assistant",
+    "message": {
+      "role": "assistant",
+      "content": [{"type": "tool_use", "name": "Bash", "input": {"timestamp": "2030-01-01T00:00:00Z"}}],
+    },
+  }
+  entries = [
+    {"type": "user", "cwd": "/tmp/p", "timestamp": "2025-01-01T00:00:00Z", "message": {"role": "user", "content": "hi"}},
+    {"type": "assistant", "message": {"role": "assistant", "content": "hello"}, "timestamp": "2025-01-01T00:00:05Z"},
+    nested,
+  ]
+  # Past CWD_SNIFF_LINES so the nested entry goes through the sniff path.
+  entries += [{"type": "progress", "data": {"n": i}} for i in range(qc.CWD_SNIFF_LINES)]
+  entries.append(nested)
+  path = _write_session(tmp_path / "s.jsonl", entries)
+
+  meta = qc.parse_metadata(path)
+
+  assert (meta.message_count, meta.user_count, meta.assistant_count) == (2, 1, 1)
+  assert meta.last_activity == datetime(2025, 1, 1, 0, 0, 5, tzinfo=timezone.utc)
+  assert qc._sniff_entry(json.dumps(nested).encode()) is None
+
+
+def test_sniff_still_reads_top_level_timestamp() -> None:
+  first = {"type": "user", "timestamp": "2025-01-01T00:00:00Z", "message": {"role": "user", "content": "x"}}
+  last = {"type": "user", "message": {"role": "user", "content": "x"}, "timestamp": "2025-01-01T00:00:00Z"}
+  before_result = {**last, "toolUseResult": {"stdout": "{}", "stderr": ""}}
+  for entry in (first, last, before_result):
+    assert qc._sniff_entry(json.dumps(entry).encode()) == ("user", "2025-01-01T00:00:00Z", "user")
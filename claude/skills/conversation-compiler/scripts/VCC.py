@@ -5,6 +5,7 @@ Produces per conversation chain:
   .txt       Full transcript (lossless rendering of JSONL)
   .min.txt   Brief mode (tool_call summaries with line refs, no separators)
   .view.txt  View mode (search-focused, only with --grep)
+  .idx       Line index: .txt line ranges -> JSONL byte offsets and uuids
 
 Usage:
   python VCC.py conversation.jsonl              # .txt + .min.txt
@@ -13,16 +14,40 @@ Usage:
   python VCC.py conversation.jsonl -tu 256      # user message truncation limit (default 256)
   python VCC.py conversation.jsonl -o outdir    # output directory
   python VCC.py project/*.jsonl --grep "kw"     # multi-file search
+  python VCC.py project/*.jsonl --grep "kw" --search-only  # hits only, no files written
+  python VCC.py project/*.jsonl --grep "a" --grep "b" --and "c" --not "d"  # a or b, in sessions with c, without d
+  python VCC.py project/*.jsonl -j 8            # compile files across 8 processes
+  python VCC.py conversation.jsonl -j 8         # one file: compile its chains across 8
+  python VCC.py conversation.jsonl --range 120-180  # just those .txt lines, read via the .idx
+  python VCC.py conversation.jsonl --follow     # keep .txt/.min.txt growing with the session
+  python VCC.py conversation.jsonl --no-cache   # ignore the manifest, recompile all chains
+  python VCC.py conversation.jsonl.gz           # .gz / .xz transcripts are read as they are
+  python VCC.py serve                           # keep parsed sessions in memory for --server runs
+  python VCC.py project/*.jsonl --grep "kw" --server  # run on that server instead
 """
 
 import argparse
 import base64
+import bisect
 import io
 import json
 import os
 import re
+import socket
+import socketserver
 import sys
+import tempfile
+import time
 import glob as globmod
+import gzip
+import hashlib
+import itertools
+import lzma
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+from contextlib import nullcontext, redirect_stderr, redirect_stdout
+from functools import partial
 
 # ── dict emitter ──
 
@@ -54,56 +79,101 @@ def _emit_dict(data, indent=0):
 
 # ── tokenizer ──
 
+# Counted tokens; whitespace between them is preserved but not counted. No
+# token spans a newline, so a text's count is the sum of its lines' counts.
 _TOK_RE = re.compile(
     r'[a-zA-Z]+'           # letters (grouped)
     r'|[0-9]+'             # digits (grouped)
     r'|[^\sa-zA-Z0-9]'     # single char: any non-whitespace non-letter non-digit
-    r'|\s+'                # whitespace (preserved, not counted)
 )
 _ANSI_RE = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
 _CTRL_RE = re.compile(r"[\x00-\x08\x0b-\x1f\x7f-\x9f]")
 
-def _tokenize(text):
-    return _TOK_RE.findall(text)
+def _count_words(lines):
+    return sum(len(_TOK_RE.findall(l)) for l in lines)
 
 # ── truncation (token-based) ──
 
 def _trunc(text, limit, ref=""):
     if not limit or not text:
         return text
-    tokens = _tokenize(text)
-    count, cut = 0, len(tokens)
-    for i, t in enumerate(tokens):
-        if t.strip():
-            count += 1
-            if count > limit:
-                cut = i
-                break
-    if cut >= len(tokens):
-        return text
-    return "".join(tokens[:cut]) + (f"...(truncated from {ref})" if ref else "...(truncated)")
+    # Cut at the first token over the limit; the rest of the text is never scanned.
+    for count, m in enumerate(_TOK_RE.finditer(text), 1):
+        if count > limit:
+            return text[:m.start()] + (f"...(truncated from {ref})" if ref else "...(truncated)")
+    return text
 
 # ── match lines ──
 
-def match_lines(lines, regex, ref_fn="x.txt", start_line=1):
+class GrepQuery:
+    """--grep terms (a hit matches any), --and terms (each must match
+    somewhere in the session) and --not terms (none may), all tested
+    against each line in the one pass over the IR. Term k is terms[k]:
+    --grep ones first, then --and, then --not. Stands in for a compiled
+    regex: search() is true where a --grep or --and term matches."""
+    __slots__ = ("terms", "n_any", "n_pos")
+
+    def __init__(self, any_of, all_of=(), none_of=()):
+        self.terms = [*any_of, *all_of, *none_of]
+        self.n_any = len(any_of)
+        self.n_pos = len(any_of) + len(all_of)
+
+    def search(self, line):
+        return any(rx.search(line) for rx in self.terms[:self.n_pos])
+
+    def accepts(self, seen):
+        """Is a session whose nodes matched the terms in seen reported?"""
+        return (any(k < self.n_any for k in seen)
+                and all(k in seen for k in range(self.n_any, self.n_pos))
+                and not any(k >= self.n_pos for k in seen))
+
+    def note(self, o):
+        """Which --grep/--and terms hit node o, when there are several."""
+        if self.n_pos < 2:
+            return ""
+        pats = [self.terms[k].pattern for k in sorted(o.hits[2]) if k < self.n_pos]
+        return f" [matched: {', '.join(pats)}]"
+
+def match_lines(lines, regex, ref_fn="x.txt", start_line=1, hits=None):
+    """Render a node's grep hits; hits = precomputed matching line indexes."""
     if not lines:
         return []
     end_line = start_line + len(lines) - 1
     from_ref = f"...(from {ref_fn}:{start_line}-{end_line})"
 
-    matched = []
-    for i, line in enumerate(lines):
-        if regex.search(line):
-            matched.append((start_line + i, line))
-    if not matched:
+    if hits is None:
+        hits = [i for i, line in enumerate(lines) if regex.search(line)]
+    if not hits:
         return [from_ref]
 
     block_ref = f"({ref_fn}:{start_line}-{end_line})"
     result = [block_ref]
-    for ln, lt in matched:
-        result.append(f"  {ln}: {lt}")
+    for i in hits:
+        result.append(f"  {start_line + i}: {lines[i]}")
     return result
 
+def _node_hits(o, q):
+    """Indexes of o's content lines matching a --grep/--and term of q,
+    computed once per node. o.hits also keeps every term o matched."""
+    cached = o.hits
+    if cached is not None and cached[0] is q:
+        return cached[1]
+    terms, n_pos = q.terms, q.n_pos
+    if len(terms) == 1:
+        rx = terms[0]
+        hits = [i for i, line in enumerate(o.content) if rx.search(line)]
+        seen = {0} if hits else set()
+    else:
+        hits, seen = [], set()
+        for i, line in enumerate(o.content):
+            ks = [k for k, rx in enumerate(terms) if rx.search(line)]
+            if ks:
+                seen.update(ks)
+                if ks[0] < n_pos:
+                    hits.append(i)
+    o.hits = (q, hits, seen)
+    return hits
+
 
 # ── lexer ──
 
@@ -118,9 +188,41 @@ def _short(fn):
 def _short_tid(tid):
     return tid[-6:] if len(tid) > 6 else tid
 
-def lex(path):
-    with open(path, encoding="utf-8") as f:
-        return [json.loads(l) for l in f if l.strip()]
+# Archived transcripts are read through these, decompressing as they go.
+# Byte offsets (.idx, manifest, --range) are then offsets into the
+# decompressed JSONL.
+_CODECS = {".gz": gzip.open, ".xz": lzma.open}
+
+def _open_jsonl(path):
+    return _CODECS.get(os.path.splitext(path)[1], open)(path, "rb")
+
+def lex(path, start=0, marks=None, end=None):
+    """Yield JSONL records one at a time; nothing is held past the caller.
+
+    Reading begins at byte offset start and stops at end, if given. Each
+    record carries its line's byte offset as "_offset". If marks is a list,
+    the byte offset just past each compact_boundary record is appended to it
+    as it is read."""
+    with _open_jsonl(path) as f:
+        f.seek(start)
+        pos = start
+        for l in f:
+            if pos == end:
+                return
+            off = pos
+            pos += len(l)
+            if l.strip():
+                try:
+                    r = json.loads(l)
+                except ValueError:
+                    if l.endswith(b"\n"):
+                        raise
+                    return  # last line still being written
+                r["_offset"] = off
+                if (marks is not None and r.get("type") == "system"
+                        and r.get("subtype") == "compact_boundary"):
+                    marks.append(pos)
+                yield r
 
 
 def _collect_stats(chain):
@@ -237,43 +339,70 @@ def _discard(r):
     return t in _DISCARD_T or (t == "system" and r.get("subtype") in _DISCARD_S)
 
 def merge_chunks(recs):
-    merged = []
+    """Fold streamed assistant chunks sharing a message id into one record.
+
+    Generator: an assistant record is held back (with any discardable
+    records that follow it) until a record arrives that can't continue
+    it, so output order matches merging the whole list in place.
+    """
+    pending = []
     active_mid = None
-    active_idx = None
     for r in recs:
         if r.get("type") == "assistant":
             m = r.get("message", {})
             mid = m.get("id")
-            if mid and mid == active_mid and active_idx is not None:
-                merged[active_idx]["message"]["content"].extend(m.get("content", []))
+            if mid and mid == active_mid and pending:
+                head = pending[0]["message"]
+                head["content"].extend(m.get("content", []))
                 if m.get("stop_reason"):
-                    merged[active_idx]["message"]["stop_reason"] = m["stop_reason"]
+                    head["stop_reason"] = m["stop_reason"]
+                continue
+            yield from pending
+            if mid:
+                pending = [r]
+                active_mid = mid
             else:
-                merged.append(r)
-                if mid:
-                    active_mid = mid
-                    active_idx = len(merged) - 1
-                else:
-                    active_mid = None
-                    active_idx = None
+                pending = []
+                active_mid = None
+                yield r
+        elif pending and _discard(r):
+            pending.append(r)
         else:
-            merged.append(r)
+            yield from pending
+            pending = []
+            yield r
             if not _discard(r):
                 active_mid = None
-                active_idx = None
-    return merged
+    yield from pending
 
-def split_chains(recs):
-    kept = [r for r in recs if not _discard(r)]
-    chains, cur = [], []
-    for r in kept:
+def _iter_chains(recs):
+    """Yield (chain, more) per compact_boundary-delimited chain.
+
+    A chain is released as soon as the next one gets its first record,
+    so `more` is known without reading ahead further; only the chain
+    being built is held in memory.
+    """
+    cur, done = [], None
+    for r in recs:
+        if _discard(r):
+            continue
         if r.get("type") == "system" and r.get("subtype") == "compact_boundary":
-            if cur: chains.append(cur)
-            cur = []
-        else:
-            cur.append(r)
-    if cur: chains.append(cur)
-    return chains
+            if cur:
+                done, cur = cur, []
+            continue
+        if done is not None:
+            yield done, True
+            done = None
+        cur.append(r)
+    if cur:
+        yield cur, False
+    elif done is not None:
+        yield done, False
+
+def split_chains(recs):
+    for chain, _ in _iter_chains(recs):
+        yield chain
+
 
 # ── image / doc ──
 
@@ -285,20 +414,42 @@ def _media_ext(media_type, default_ext):
         return "jpg"
     return ext or default_ext
 
-def _extract_base64(source, outdir, data_prefix, data_index, stem, default_mt, default_ext):
-    mt = source.get("media_type", default_mt)
-    fn = f"{data_prefix}_{stem}_{data_index}.{_media_ext(mt, default_ext)}"
-    with open(os.path.join(outdir, fn), "wb") as f:
-        f.write(base64.b64decode(source.get("data", "")))
+# Media is only named during parse; bytes are written by write_media once
+# the chain's transcripts are, so --search-only and cached chains never
+# decode anything. Names are keyed by payload: a screenshot repeated in a
+# chain is one file, and only new payloads advance the counter.
+
+_B64_CHUNK = 1 << 20  # multiple of 4: chunks decode independently
+
+def _media_ref(source, media, data_prefix, data_ctr, stem, default_mt, default_ext):
+    ext = _media_ext(source.get("media_type", default_mt), default_ext)
+    key = (stem, ext, source.get("data", ""))
+    hit = media.get(key)
+    if hit is not None:
+        return hit[0]
+    fn = f"{data_prefix}_{stem}_{data_ctr[0]}.{ext}"
+    data_ctr[0] += 1
+    media[key] = (fn, source)
     return fn
 
-def _extract_img(source, outdir, data_prefix, data_index):
-    return _extract_base64(source, outdir, data_prefix, data_index,
-                           "img", "image/png", "png")
-
-def _extract_doc(source, outdir, data_prefix, data_index):
-    return _extract_base64(source, outdir, data_prefix, data_index,
-                           "doc", "application/octet-stream", "bin")
+def _img_ref(source, media, data_prefix, data_ctr):
+    return _media_ref(source, media, data_prefix, data_ctr,
+                      "img", "image/png", "png")
+
+def _doc_ref(source, media, data_prefix, data_ctr):
+    return _media_ref(source, media, data_prefix, data_ctr,
+                      "doc", "application/octet-stream", "bin")
+
+def write_media(outdir, refs):
+    """Write (name, source) pairs, e.g. a media dict's values()."""
+    for fn, source in refs:
+        data = source.get("data", "")
+        with open(os.path.join(outdir, fn), "wb") as f:
+            if "\n" in data or "\r" in data:  # wrapped base64: chunks wouldn't align
+                f.write(base64.b64decode(data))
+                continue
+            for i in range(0, len(data), _B64_CHUNK):
+                f.write(base64.b64decode(data[i:i + _B64_CHUNK]))
 
 
 # ── tool_call summary ──
@@ -326,32 +477,86 @@ def _tool_summary(name, inp):
 
 # ── IR node ──
 
-def _node(typ, content, **kw):
-    o = {"type": typ, "content": content,
-         "searchable": kw.pop("searchable", False)}
-    o.update(kw)
-    return o
+class Node:
+    """One IR node. Slotted: a session compiles to tens of thousands of these.
+
+    The lowered views (content_brief / content_view) reuse the content list
+    itself wherever the text passes through unchanged, so the brief and view
+    passes allocate only for lines they actually rewrite."""
+    __slots__ = ("type", "content", "searchable", "sec", "blk", "tool_summary",
+                 "start_line", "end_line", "content_brief", "content_view", "hits",
+                 "src")
+
+    def __init__(self, typ, content, searchable=False, sec=None, blk=None,
+                 tool_summary=None):
+        self.type = typ
+        self.content = content
+        self.searchable = searchable
+        self.sec = sec
+        self.blk = blk
+        self.tool_summary = tool_summary
+        self.start_line = None
+        self.end_line = None
+        self.content_brief = None
+        self.content_view = None
+        self.hits = None
+        self.src = None  # (byte offset, uuid, media names) of the source record
 
 # ── parser ──
 
-def parse(chain, outdir, data_prefix, data_ctr):
-    ir = []
-    sec = 0
-    blk = 0
-
+def _tool_names(chain):
     tid_name = {}
     for r in chain:
         if r.get("type") == "assistant":
             for b in r.get("message", {}).get("content", []):
                 if b.get("type") == "tool_use":
                     tid_name[b.get("id", "")] = b.get("name", "unknown")
+    return tid_name
+
+def parse(chain, media, data_prefix, data_ctr, tid_name=None, media_names=None):
+    """Lower a chain of records to IR nodes, each tagged with its record's src.
+
+    render_range parses a single record out of context; it passes the chain's
+    tool names and the record's media names, both read back from the .idx."""
+    if tid_name is None:
+        tid_name = _tool_names(chain)
+    ir = [o for nodes in parse_iter(chain, media, data_prefix, data_ctr, tid_name, media_names)
+          for o in nodes]
+    ir.append(Node("meta", [""]))  # trailing newline
+    return ir
+
+def parse_iter(recs, media, data_prefix, data_ctr, tid_name, media_names=None):
+    """Yield each record's IR nodes as soon as it is consumed.
+
+    Section and block numbering carry across records, so the nodes are what
+    parse gives for the whole chain. recs may be a live stream (--follow) as
+    long as tid_name learns each tool_use before its result arrives."""
+    ir = []
+    sec = 0
+    blk = 0
+    rec_media = []
+
+    def _ref(src, ref_fn):
+        if media_names is not None:
+            fn = next(media_names)
+        else:
+            fn = ref_fn(src, media, data_prefix, data_ctr)
+        rec_media.append(fn)
+        return fn
+
+    def _tag(r):
+        src = (r.get("_offset", -1), r.get("uuid", ""), tuple(rec_media))
+        rec_media.clear()
+        for o in ir:
+            if o.sec is not None:
+                o.src = src
 
     def _emit_sep():
         if sec > 0:
-            ir.append(_node("meta", ["", SEP]))
+            ir.append(Node("meta", ["", SEP]))
 
     def _emit_header(h):
-        ir.append(_node("meta_header", [h, ""], _sec=sec))
+        ir.append(Node("meta_header", [h, ""], sec=sec))
 
     def _emit_blocks(blocks, text_type):
         nonlocal blk
@@ -361,25 +566,25 @@ def parse(chain, outdir, data_prefix, data_ctr):
             if bt == "thinking":
                 txt = _sanitize(b.get("thinking", ""))
                 if not txt: continue
-                ir.append(_node("meta", [">>>thinking"], _sec=sec, _blk=blk))
-                ir.append(_node("thinking", txt.split("\n"), searchable=True,
-                                 _sec=sec, _blk=blk))
-                ir.append(_node("meta", ["<<<thinking"], _sec=sec, _blk=blk))
+                ir.append(Node("meta", [">>>thinking"], sec=sec, blk=blk))
+                ir.append(Node("thinking", txt.split("\n"), searchable=True,
+                                sec=sec, blk=blk))
+                ir.append(Node("meta", ["<<<thinking"], sec=sec, blk=blk))
                 blk += 1; has_any = True
 
             elif bt == "redacted_thinking":
-                ir.append(_node("meta", [">>>redacted_thinking"], _sec=sec, _blk=blk))
-                ir.append(_node("redacted_thinking",
-                                 ["[content redacted by model provider]"],
-                                 searchable=True, _sec=sec, _blk=blk))
-                ir.append(_node("meta", ["<<<redacted_thinking"], _sec=sec, _blk=blk))
+                ir.append(Node("meta", [">>>redacted_thinking"], sec=sec, blk=blk))
+                ir.append(Node("redacted_thinking",
+                                ["[content redacted by model provider]"],
+                                searchable=True, sec=sec, blk=blk))
+                ir.append(Node("meta", ["<<<redacted_thinking"], sec=sec, blk=blk))
                 blk += 1; has_any = True
 
             elif bt == "text":
                 txt = _sanitize(b.get("text", ""))
                 if not txt: continue
-                ir.append(_node(text_type, txt.split("\n"), searchable=True,
-                                 _sec=sec, _blk=blk))
+                ir.append(Node(text_type, txt.split("\n"), searchable=True,
+                                sec=sec, blk=blk))
                 blk += 1; has_any = True
 
             elif bt == "tool_use":
@@ -388,48 +593,47 @@ def parse(chain, outdir, data_prefix, data_ctr):
                 inp = b.get("input", {})
                 hl = f">>>tool_call {name}:{_short_tid(tid)}"
                 summary = _tool_summary(name, inp)
-                ir.append(_node("meta", [hl], _sec=sec, _blk=blk,
-                                 _tool_summary=summary))
+                ir.append(Node("meta", [hl], sec=sec, blk=blk,
+                                tool_summary=summary))
                 if inp:
-                    ir.append(_node("tool_call", _emit_dict(inp).split("\n"),
-                                     searchable=True, _sec=sec, _blk=blk))
-                ir.append(_node("meta", ["<<<tool_call"], _sec=sec, _blk=blk))
+                    ir.append(Node("tool_call", _emit_dict(inp).split("\n"),
+                                    searchable=True, sec=sec, blk=blk))
+                ir.append(Node("meta", ["<<<tool_call"], sec=sec, blk=blk))
                 blk += 1; has_any = True
 
             elif bt == "image":
                 src = b.get("source", {})
                 if src.get("type") == "base64":
-                    fn = _extract_img(src, outdir, data_prefix, data_ctr[0])
-                    data_ctr[0] += 1
-                    ir.append(_node(f"{text_type}_image", [f"[image: {fn}]"],
-                                     searchable=True, _sec=sec, _blk=blk))
+                    fn = _ref(src, _img_ref)
+                    ir.append(Node(f"{text_type}_image", [f"[image: {fn}]"],
+                                    searchable=True, sec=sec, blk=blk))
                     blk += 1; has_any = True
 
             elif bt == "document":
                 src = b.get("source", {})
                 label = "[document]"
                 if src.get("type") == "base64":
-                    fn = _extract_doc(src, outdir, data_prefix, data_ctr[0])
-                    data_ctr[0] += 1
+                    fn = _ref(src, _doc_ref)
                     label = f"[document: {fn}]"
-                ir.append(_node(f"{text_type}_document", [label],
-                                 searchable=True, _sec=sec, _blk=blk))
+                ir.append(Node(f"{text_type}_document", [label],
+                                searchable=True, sec=sec, blk=blk))
                 blk += 1; has_any = True
         return has_any
 
-    for r in chain:
+    def _record(r):
+        nonlocal sec, blk
         rt = r.get("type")
 
         if rt == "system":
-            if r.get("subtype") == "compact_boundary": continue
+            if r.get("subtype") == "compact_boundary": return
             content = r.get("content", "") or r.get("message", {}).get("content", "")
-            if not content: continue
+            if not content: return
             _emit_sep(); _emit_header("[system]")
             if isinstance(content, list):
                 _emit_blocks(content, "system")
             else:
-                ir.append(_node("system", _sanitize(content).split("\n"), searchable=True,
-                                 _sec=sec, _blk=blk))
+                ir.append(Node("system", _sanitize(content).split("\n"), searchable=True,
+                                sec=sec, blk=blk))
                 blk += 1
             sec += 1
 
@@ -438,16 +642,16 @@ def parse(chain, outdir, data_prefix, data_ctr):
                 content = r.get("message", {}).get("content", "")
                 nlines = content.count("\n") + 1 if content else 0
                 _emit_sep(); _emit_header("[user]")
-                ir.append(_node("user", [f"[compact summary — {nlines} lines]"], searchable=False,
-                                 _sec=sec, _blk=blk))
+                ir.append(Node("user", [f"[compact summary — {nlines} lines]"], searchable=False,
+                                sec=sec, blk=blk))
                 blk += 1; sec += 1
-                continue
+                return
             content = r.get("message", {}).get("content", "")
             if isinstance(content, str):
                 if content:
                     _emit_sep(); _emit_header("[user]")
-                    ir.append(_node("user", _sanitize(content).split("\n"), searchable=True,
-                                     _sec=sec, _blk=blk))
+                    ir.append(Node("user", _sanitize(content).split("\n"), searchable=True,
+                                    sec=sec, blk=blk))
                     blk += 1; sec += 1
             elif isinstance(content, list):
                 tblocks = [b for b in content if b.get("type") != "tool_result"]
@@ -481,17 +685,15 @@ def parse(chain, outdir, data_prefix, data_ctr):
                             elif item.get("type") == "image":
                                 src = item.get("source", {})
                                 if src.get("type") == "base64":
-                                    fn = _extract_img(src, outdir, data_prefix, data_ctr[0])
-                                    data_ctr[0] += 1
+                                    fn = _ref(src, _img_ref)
                                     parts.append(f"[image: {fn}]")
                             elif item.get("type") == "document":
                                 src = item.get("source", {})
                                 if src.get("type") == "base64":
-                                    fn = _extract_doc(src, outdir, data_prefix, data_ctr[0])
-                                    data_ctr[0] += 1
+                                    fn = _ref(src, _doc_ref)
                                     parts.append(f"[document: {fn}]")
-                    ir.append(_node(btype, _sanitize("\n\n".join(parts)).split("\n"),
-                                     searchable=True, _sec=sec, _blk=blk))
+                    ir.append(Node(btype, _sanitize("\n\n".join(parts)).split("\n"),
+                                    searchable=True, sec=sec, blk=blk))
                     blk += 1; sec += 1
 
         elif rt == "assistant":
@@ -509,25 +711,29 @@ def parse(chain, outdir, data_prefix, data_ctr):
                 _emit_blocks(blocks, "assistant")
                 sec += 1
 
-    ir.append(_node("meta", [""]))  # trailing newline
-    return ir
+    for r in recs:
+        ir = []
+        _record(r)
+        _tag(r)
+        yield ir
 
 
 # ── IR walk ──
 
 def _is_tool_summary(o):
-    return o.get("_tool_summary") is not None
+    return o.tool_summary is not None
 
-def _walk(ir, key="content"):
-    prev_blk = None
-    prev_o = None
+def _walk(ir, key="content", state=None):
+    """Yield (node, lines, blank-before) for nodes with lines under key.
+    state, a [prev_blk, prev_o] list, carries the walk across calls."""
+    prev_blk, prev_o = state if state is not None else (None, None)
     for o in ir:
-        c = o.get(key)
+        c = getattr(o, key)
         if c is None:
             continue
         if not c:
             continue
-        blk = o.get("_blk")
+        blk = o.blk
         if blk is not None and prev_blk is not None and blk != prev_blk:
             if key == "content":
                 blank = True
@@ -540,27 +746,28 @@ def _walk(ir, key="content"):
         if blk is not None:
             prev_blk = blk
             prev_o = o
-        elif SEP in o.get("content", []):
+        elif SEP in o.content:
             prev_blk = None
             prev_o = None
+        if state is not None:
+            state[:] = prev_blk, prev_o
 
 
 # ── line assignment ──
 
-def assign_lines(ir):
-    line = 0
-    for o, c, blank in _walk(ir, "content"):
+def assign_lines(ir, line=0, state=None):
+    for o, c, blank in _walk(ir, "content", state):
         if blank: line += 1
-        o["start_line"] = line
+        o.start_line = line
         line += len(c)
-        o["end_line"] = line - 1
+        o.end_line = line - 1
     return line
 
 
 # ── lowering helpers ──
 
 def _is_truncatable(o):
-    t = o["type"]
+    t = o.type
     if t in ("meta", "meta_header", "thinking", "redacted_thinking"):
         return False
     if t.endswith("_image") or t.endswith("_document"):
@@ -568,16 +775,16 @@ def _is_truncatable(o):
     return True
 
 def _is_thinking(o):
-    return o["type"] in ("thinking", "redacted_thinking")
+    return o.type in ("thinking", "redacted_thinking")
 
 def _sec_roles(ir):
     """Map sec -> role from meta_header content."""
     roles = {}
     for o in ir:
-        if o["type"] == "meta_header":
-            s = o.get("_sec")
+        if o.type == "meta_header":
+            s = o.sec
             if s is None: continue
-            h = o["content"][0]
+            h = o.content[0]
             if h.startswith("[tool_error]"):
                 roles[s] = "tool_error"
             elif h.startswith("[tool]"):
@@ -610,13 +817,12 @@ def _strip_noise_xml(text):
     text = _BRIEF_UNWRAP_RE.sub('', text)
     return text.strip()
 
-def _user_hidden_in_brief(ir, sec):
-    """Check if a user section should be entirely hidden in brief mode."""
-    blocks = [o for o in ir if o.get("_sec") == sec and o.get("searchable")]
+def _user_hidden_in_brief(blocks):
+    """Check if a user section (its searchable nodes) should be hidden in brief mode."""
     if not blocks:
         return False
     for o in blocks:
-        text = "\n".join(o["content"]).strip()
+        text = "\n".join(o.content).strip()
         if not text:
             continue
         if _META_USER_RE.match(text):
@@ -628,14 +834,13 @@ def _user_hidden_in_brief(ir, sec):
         return False
     return True
 
-def _section_hidden_exact(ir, sec):
+def _section_hidden_exact(blocks):
     """Check if all searchable content in a section is an exact-match hide string."""
-    blocks = [o for o in ir if o.get("_sec") == sec and o.get("searchable")
-              and o["type"] not in ("thinking", "redacted_thinking")]
+    blocks = [o for o in blocks if o.type not in ("thinking", "redacted_thinking")]
     if not blocks:
         return False
     for o in blocks:
-        text = "\n".join(o["content"]).strip()
+        text = "\n".join(o.content).strip()
         if text not in _BRIEF_HIDE_EXACT:
             return False
     return True
@@ -648,23 +853,23 @@ def _tid_result_ranges(ir):
     # Find which sec corresponds to which short_tid
     tid_sec = {}
     for o in ir:
-        if o["type"] == "meta_header":
-            c = o["content"]
+        if o.type == "meta_header":
+            c = o.content
             if c and len(c) >= 1:
                 h = c[0]
                 # [tool] name:AABBCC or [tool_error] name:AABBCC
                 if h.startswith("[tool]") or h.startswith("[tool_error]"):
                     parts = h.split(":")
                     if len(parts) >= 2:
-                        tid_sec[parts[-1]] = o.get("_sec")
+                        tid_sec[parts[-1]] = o.sec
     # Collect line ranges per sec
     sec_range = {}
     for o in ir:
-        s = o.get("_sec")
+        s = o.sec
         if s is None:
             continue
-        sl = o.get("start_line")
-        el = o.get("end_line")
+        sl = o.start_line
+        el = o.end_line
         if sl is not None and el is not None:
             if s not in sec_range:
                 sec_range[s] = [sl, el]
@@ -679,119 +884,116 @@ def _tid_result_ranges(ir):
     return result
 
 
-def lower_brief(ir, truncate, filename="", truncate_user=256):
+def lower_brief(ir, truncate, filename="", truncate_user=256, context=None):
+    """Set content_brief on every node; returns the visible sections.
+
+    context = (role of the last visible section, whether any was visible)
+    for the part of the chain before ir, when lowering it slice by slice."""
+    prior_role, prior_visible = context or (None, False)
     short = _short(filename)
     roles = _sec_roles(ir)
     tid_ranges = _tid_result_ranges(ir)
 
-    # Sections visible in truncation: not tool/tool_error/system
-    visible_secs = {sec for sec, role in roles.items()
-                     if role not in ("tool", "tool_error", "system")}
-
-    # Determine which assistant sections to merge:
-    # An assistant section merges if the previous VISIBLE section is also assistant.
-    all_secs = sorted(roles.keys())
-    merge_secs = set()
-    for i in range(1, len(all_secs)):
-        cur_sec = all_secs[i]
-        if not (cur_sec in visible_secs and
-                roles.get(cur_sec) == "assistant"):
-            continue
-        # Find previous visible section
-        for j in range(i - 1, -1, -1):
-            if all_secs[j] in visible_secs:
-                if roles.get(all_secs[j]) == "assistant":
-                    merge_secs.add(cur_sec)
-                break
-
-    # Track which secs only have thinking content (no visible non-thinking blocks)
+    # One pass over the IR: searchable nodes per section, sections with
+    # non-thinking content, and the next section after every index (for
+    # separators). Everything below is then linear in the IR size.
+    sec_blocks = {}
     sec_has_nonthink = set()
     for o in ir:
-        s = o.get("_sec")
+        s = o.sec
         if s is None: continue
-        if o["type"] not in ("meta", "meta_header", "thinking", "redacted_thinking"):
+        if o.searchable:
+            sec_blocks.setdefault(s, []).append(o)
+        if o.type not in ("meta", "meta_header", "thinking", "redacted_thinking"):
             sec_has_nonthink.add(s)
-
-    # Sections that are all-thinking should still be hidden in truncation
-    # (they have no visible content after thinking is removed)
-    for sec in list(visible_secs):
+    next_sec = [None] * len(ir)
+    ns = None
+    for idx in range(len(ir) - 1, -1, -1):
+        next_sec[idx] = ns
+        s = ir[idx].sec
+        if s is not None:
+            ns = s
+
+    # Sections visible in truncation: not tool/tool_error/system.
+    # All-thinking sections are hidden too (nothing left once thinking is
+    # removed), as are noise-only user turns and exact-match filler.
+    visible_secs = set()
+    for sec, role in roles.items():
+        if role in ("tool", "tool_error", "system"):
+            continue
         if sec not in sec_has_nonthink:
-            visible_secs.discard(sec)
-        elif roles.get(sec) == "user" and _user_hidden_in_brief(ir, sec):
-            visible_secs.discard(sec)
-        elif _section_hidden_exact(ir, sec):
-            visible_secs.discard(sec)
-
-    # Recompute merge_secs after possible visibility changes
-    all_secs_2 = sorted(roles.keys())
+            continue
+        blocks = sec_blocks.get(sec, [])
+        if role == "user" and _user_hidden_in_brief(blocks):
+            continue
+        if _section_hidden_exact(blocks):
+            continue
+        visible_secs.add(sec)
+    first_visible = min(visible_secs) if visible_secs else None
+
+    # An assistant section merges if the previous VISIBLE section is also assistant.
     merge_secs = set()
-    for i in range(1, len(all_secs_2)):
-        cur_sec = all_secs_2[i]
-        if not (cur_sec in visible_secs and
-                roles.get(cur_sec) == "assistant"):
+    prev_role = prior_role
+    for sec in sorted(roles):
+        if sec not in visible_secs:
             continue
-        for j in range(i - 1, -1, -1):
-            if all_secs_2[j] in visible_secs:
-                if roles.get(all_secs_2[j]) == "assistant":
-                    merge_secs.add(cur_sec)
-                break
+        role = roles[sec]
+        if role == "assistant" and prev_role == "assistant":
+            merge_secs.add(sec)
+        prev_role = role
 
     for idx, o in enumerate(ir):
-        s = o.get("_sec")
+        s = o.sec
 
         # Separator: replace with blank line in brief mode
-        if s is None and o["type"] == "meta" and SEP in o.get("content", []):
-            ns = None
-            for j in range(idx + 1, len(ir)):
-                ns = ir[j].get("_sec")
-                if ns is not None:
-                    break
+        if s is None and o.type == "meta" and SEP in o.content:
+            ns = next_sec[idx]
             if ns is None or ns not in visible_secs:
-                o["content_brief"] = None
+                o.content_brief = None
             elif ns in merge_secs:
-                o["content_brief"] = None
-            elif not any(sec in visible_secs for sec in range(ns)):
-                o["content_brief"] = None
+                o.content_brief = None
+            elif not prior_visible and first_visible >= ns:  # nothing visible before it
+                o.content_brief = None
             else:
-                o["content_brief"] = [""]
+                o.content_brief = [""]
             continue
 
         # Section not visible → hide
         if s is not None and s not in visible_secs:
-            o["content_brief"] = None
+            o.content_brief = None
             continue
 
         # Merged assistant: hide separator and header
-        if s in merge_secs and o["type"] == "meta_header":
-            o["content_brief"] = None
+        if s in merge_secs and o.type == "meta_header":
+            o.content_brief = None
             continue
 
         # Thinking / redacted_thinking → hide (including their >>> <<< metas)
         if _is_thinking(o):
-            o["content_brief"] = None
+            o.content_brief = None
             continue
-        if o["type"] == "meta":
-            c = o["content"]
+        if o.type == "meta":
+            c = o.content
             if c and (c[0].startswith(">>>thinking") or c[0].startswith("<<<thinking") or
                       c[0].startswith(">>>redacted_thinking") or c[0].startswith("<<<redacted_thinking")):
-                o["content_brief"] = None
+                o.content_brief = None
                 continue
 
         # Tool_call three-piece: collapse to single-line summary with line ref
-        if o["type"] == "meta" and o.get("content", []):
-            c0 = o["content"][0]
+        if o.type == "meta" and o.content:
+            c0 = o.content[0]
             if c0.startswith(">>>tool_call"):
                 # Hide noise tools (internal bookkeeping)
                 tool_name = c0.split()[1].split(":")[0] if len(c0.split()) > 1 else ""
                 if tool_name in _BRIEF_HIDE_TOOLS:
-                    o["content_brief"] = None
+                    o.content_brief = None
                     continue
-                summary = o.get("_tool_summary", f"* unknown")
-                s = o.get("start_line")
-                e = o.get("end_line")
+                summary = o.tool_summary or "* unknown"
+                s = o.start_line
+                e = o.end_line
                 for j in (idx + 1, idx + 2):
-                    if j < len(ir) and ir[j].get("_blk") == o.get("_blk"):
-                        je = ir[j].get("end_line")
+                    if j < len(ir) and ir[j].blk == o.blk:
+                        je = ir[j].end_line
                         if je is not None:
                             e = je
                 if s is not None and e is not None:
@@ -803,48 +1005,49 @@ def lower_brief(ir, truncate, filename="", truncate_user=256):
                         summary = f"{summary} ({short}:{s+1}-{e+1},{rr[0]+1}-{rr[1]+1})"
                     else:
                         summary = f"{summary} ({short}:{s+1}-{e+1})"
-                o["content_brief"] = [summary]
+                o.content_brief = [summary]
                 continue
             if c0 == "<<<tool_call":
-                o["content_brief"] = None
+                o.content_brief = None
                 continue
 
-        if o["type"] == "tool_call":
-            o["content_brief"] = None
+        if o.type == "tool_call":
+            o.content_brief = None
             continue
 
         # meta_header → copy
-        if o["type"] == "meta_header":
-            o["content_brief"] = list(o["content"])
+        if o.type == "meta_header":
+            o.content_brief = o.content
             continue
 
         # meta → copy
-        if o["type"] == "meta":
-            o["content_brief"] = list(o["content"])
+        if o.type == "meta":
+            o.content_brief = o.content
             continue
 
         # Truncatable content
         if _is_truncatable(o):
-            node_start = o.get("start_line", 0) + 1
-            node_end = o.get("end_line", o.get("start_line", 0)) + 1
+            node_start = (o.start_line or 0) + 1
+            node_end = (o.end_line if o.end_line is not None else (o.start_line or 0)) + 1
             ref = f"{short}:{node_start}-{node_end}"
-            text = "\n".join(o["content"])
-            if o["type"] == "user":
+            text = "\n".join(o.content)
+            if o.type == "user":
                 text = _strip_noise_xml(text)
                 if not text.strip():
-                    o["content_brief"] = None
+                    o.content_brief = None
                     continue
-            lim = truncate_user if o["type"] == "user" else truncate
+            lim = truncate_user if o.type == "user" else truncate
             lines = (_trunc(text, lim, ref) if lim else text).split("\n")
             # Strip leading blank lines
             while lines and not lines[0]:
                 lines.pop(0)
-            o["content_brief"] = lines
+            o.content_brief = lines
             continue
 
         # Non-truncatable (images, documents, etc) → copy
-        o["content_brief"] = list(o["content"])
+        o.content_brief = o.content
 
+    return visible_secs
 
 # ── lowering: view ──
 
@@ -852,106 +1055,179 @@ def lower_view(ir, filename="", grep_pattern=None):
     if not grep_pattern:
         # No grep: view is same as truncated (shouldn't normally be called)
         for o in ir:
-            o["content_view"] = o.get("content_brief")
+            o.content_view = o.content_brief
         return
 
     short = _short(filename)
 
-    # Per-node match check
     def _node_matches(o):
-        if not o["searchable"]:
-            return False
-        for line in o["content"]:
-            if grep_pattern.search(line):
-                return True
-        return False
+        return o.searchable and bool(_node_hits(o, grep_pattern))
 
     # Pass 1: determine visibility for each searchable block
     block_visible = {}  # blk -> bool
     for o in ir:
-        blk = o.get("_blk")
+        blk = o.blk
         if blk is None or blk in block_visible:
             continue
-        if o["searchable"] and _node_matches(o):
+        if _node_matches(o):
             block_visible[blk] = True
 
     # Derive which sections have any visible block (for header/separator logic)
     sec_has_visible = set()
     for o in ir:
-        blk = o.get("_blk")
+        blk = o.blk
         if blk is not None and block_visible.get(blk):
-            s = o.get("_sec")
+            s = o.sec
             if s is not None:
                 sec_has_visible.add(s)
 
+    # Separators sit between two visible sections: one backward sweep for
+    # "next section is visible", one forward flag for "some earlier one was".
+    next_vis = [False] * len(ir)
+    nv = False
+    for idx in range(len(ir) - 1, -1, -1):
+        next_vis[idx] = nv
+        ns = ir[idx].sec
+        if ns is not None:
+            nv = ns in sec_has_visible
+    prev_vis = False
+
     # Pass 2: set content_view for each node
     for idx, o in enumerate(ir):
-        s = o.get("_sec")
-        blk = o.get("_blk")
+        s = o.sec
+        blk = o.blk
 
         # Separator: show only between two sections that have visible blocks
-        if s is None and o["type"] == "meta" and SEP in o.get("content", []):
-            next_vis = False
-            for j in range(idx + 1, len(ir)):
-                ns = ir[j].get("_sec")
-                if ns is not None:
-                    next_vis = ns in sec_has_visible
-                    break
-            prev_vis = False
-            seen = set()
-            for j in range(idx - 1, -1, -1):
-                ps = ir[j].get("_sec")
-                if ps is not None and ps not in seen:
-                    seen.add(ps)
-                    if ps in sec_has_visible:
-                        prev_vis = True
-                        break
-            o["content_view"] = list(o["content"]) if (next_vis and prev_vis) else None
+        if s is None and o.type == "meta" and SEP in o.content:
+            o.content_view = o.content if (next_vis[idx] and prev_vis) else None
             continue
+        if s is not None and s in sec_has_visible:
+            prev_vis = True
 
         # meta_header: show if section has any visible block
-        if o["type"] == "meta_header":
-            o["content_view"] = list(o["content"]) if s in sec_has_visible else None
+        if o.type == "meta_header":
+            o.content_view = o.content if s in sec_has_visible else None
             continue
 
         # Thinking / tool_call metas: show if same blk matched
-        if o["type"] == "meta" and o.get("content", []):
-            c0 = o["content"][0]
+        if o.type == "meta" and o.content:
+            c0 = o.content[0]
             if c0.startswith(">>>thinking") or c0.startswith("<<<thinking") or \
                c0.startswith(">>>redacted_thinking") or c0.startswith("<<<redacted_thinking") or \
                c0.startswith(">>>tool_call ") or c0 == "<<<tool_call":
-                o["content_view"] = list(o["content"]) if block_visible.get(blk) else None
+                o.content_view = o.content if block_visible.get(blk) else None
                 continue
 
         # Other meta → show if section has visible blocks
-        if o["type"] == "meta":
-            o["content_view"] = list(o["content"]) if s in sec_has_visible else None
+        if o.type == "meta":
+            o.content_view = o.content if s in sec_has_visible else None
             continue
 
         # Searchable content blocks: show only if this block matches
-        if o["searchable"]:
+        if o.searchable:
             if _node_matches(o):
-                node_start = o.get("start_line", 0) + 1
-                o["content_view"] = match_lines(
-                    o["content"], grep_pattern, short, node_start)
+                node_start = (o.start_line or 0) + 1
+                o.content_view = match_lines(
+                    o.content, grep_pattern, short, node_start,
+                    _node_hits(o, grep_pattern))
+                o.content_view[0] += grep_pattern.note(o)
             else:
-                o["content_view"] = None
+                o.content_view = None
             continue
 
         # Non-searchable (images, docs, etc) → hide
-        o["content_view"] = None
+        o.content_view = None
 
 
 # ── codegen ──
 
-def emit(ir, key="content"):
+def emit(ir, key="content", words=None, state=None):
+    """Lines for `key`; if words is given, words[0] accumulates their word count."""
     lines = []
-    for o, c, blank in _walk(ir, key):
+    for o, c, blank in _walk(ir, key, state):
         if blank: lines.append("")
         lines.extend(c)
+        if words is not None:
+            words[0] += _count_words(c)
     return lines
 
 
+# ── line index ──
+#
+# <chain>.idx maps .txt lines back to the JSONL, one tab-separated row each:
+#   T  tool_use id  tool name     names for tool result headers
+#   N  start  end  offset  uuid   a node's 1-based .txt lines and its record
+#   M  offset  name...            media file names that record's nodes use
+# Separators and the trailing blank line have offset -1. With the T and M
+# rows, any one record re-renders exactly as it does in its chain.
+
+_IDX_VERSION = 1
+
+def _idx_rows(nodes, tids, named):
+    """Rows for nodes with assigned lines; named holds offsets already given M rows."""
+    rows = [f"T\t{tid}\t{name}" for tid, name in tids]
+    for o in nodes:
+        if o.start_line is None:
+            continue
+        off, uuid, names = o.src or (-1, "", ())
+        rows.append(f"N\t{o.start_line + 1}\t{o.end_line + 1}\t{off}\t{uuid}")
+        if names and off not in named:
+            named.add(off)
+            rows.append(f"M\t{off}\t" + "\t".join(names))
+    return rows
+
+def write_idx(path, ir, tid_name):
+    rows = [f"# vcc-idx {_IDX_VERSION}", *_idx_rows(ir, tid_name.items(), set())]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(rows) + "\n")
+
+def read_idx(path):
+    """(tool names, [(start, end, offset, uuid)], {offset: media names})"""
+    tid_name, nodes, media = {}, [], {}
+    with open(path, encoding="utf-8") as f:
+        head = f.readline().split()
+        if head[-1:] != [str(_IDX_VERSION)]:
+            raise ValueError(f"{path}: not a version {_IDX_VERSION} index")
+        for row in f:
+            kind, *v = row.rstrip("\n").split("\t")
+            if kind == "N":
+                nodes.append((int(v[0]), int(v[1]), int(v[2]), v[3]))
+            elif kind == "T":
+                tid_name[v[0]] = v[1]
+            elif kind == "M":
+                media[int(v[0])] = v[1:]
+    return tid_name, nodes, media
+
+def render_range(input_path, idx_path, lo, hi):
+    """Lines lo..hi (1-based, inclusive) of a chain's .txt, rendered from just
+    the JSONL records behind them: each is read by seeking to its offset and
+    parsed on its own. The stats footer is not part of any record."""
+    tid_name, nodes, media = read_idx(idx_path)
+    by_off = {}
+    for n in nodes:
+        by_off.setdefault(n[2], []).append(n)
+    lines = {}
+    for off in dict.fromkeys(n[2] for n in nodes if n[0] <= hi and n[1] >= lo):
+        if off < 0:
+            for start, end, _, _ in by_off[off]:
+                if end > start:  # separator: blank line, then SEP
+                    lines[end] = SEP
+            continue
+        # The record at off comes first out of merge_chunks, with any
+        # streamed chunks that follow it folded in.
+        rec = next(merge_chunks(lex(input_path, off)))
+        ir = parse([rec], {}, "", [0], tid_name, iter(media.get(off, ())))
+        got = [o for o in ir if o.src is not None]
+        want = by_off[off]
+        if len(got) != len(want):
+            raise ValueError(f"{idx_path} is out of date with {input_path}")
+        for (start, end, _, _), o in zip(want, got):
+            for i, line in enumerate(o.content[:end - start + 1]):
+                lines[start + i] = line
+    last = nodes[-1][1] if nodes else 0
+    return [lines.get(i, "") for i in range(lo, min(hi, last) + 1)]
+
+
 # ── grep ──
 
 def _rel_path(fp):
@@ -960,89 +1236,696 @@ def _rel_path(fp):
     except ValueError:
         return os.path.abspath(fp)
 
-def grep_search(results, pattern):
-    first = True
-    for filepath, ir in reversed(results):
-        short = _rel_path(filepath)
-        for o in reversed(ir):
-            if not o["searchable"]: continue
-            lines = match_lines(o["content"], pattern, short, o.get("start_line", 0) + 1)
-            if len(lines) <= 1:
-                continue
+def grep_hits(filepath, ir, pattern, seen=None):
+    """Matching nodes of one chain as ready-to-print line groups, in IR order.
+    If seen is a set, every term matched anywhere in the chain is added to it.
+
+    This is all grep_search needs from an IR, so a chain compiled in a
+    worker process hands back these few lines instead of the whole tree."""
+    short = _rel_path(filepath)
+    hits = []
+    for o in ir:
+        if not o.searchable: continue
+        lines = match_lines(o.content, pattern, short, (o.start_line or 0) + 1,
+                            _node_hits(o, pattern))
+        if seen is not None:
+            seen |= o.hits[2]
+        if len(lines) <= 1:
+            continue
+        lines[0] = f"{lines[0]} [{o.type}]{pattern.note(o)}"
+        hits.append(lines)
+    return hits
+
+def _session_hits(results, seen, q, views=False):
+    """One session's grep results, emptied unless the terms it matched
+    (seen, across all its chains) satisfy q's --and and --not terms. With
+    views, an excluded session's .view.txt files are emptied too: they are
+    written chain by chain, before the verdict is known."""
+    if q.accepts(seen):
+        return results
+    if views:
+        for fp, _ in results:
+            open(fp[:-4] + ".view.txt", "w").close()
+    return [(fp, []) for fp, _ in results]
+
+def grep_search(results, first=True):
+    """Print hits newest-first. Returns the updated `first` flag so
+    successive calls can stream one file at a time."""
+    for _, hits in reversed(results):
+        for lines in reversed(hits):
             if not first: print()
             first = False
-            print(f"{lines[0]} [{o['type']}]")
-            for lt in lines[1:]:
+            for lt in lines:
                 print(lt)
-
-
-# ── compile ──
-
-def compile_pass(input_path, output_dir=None, truncate=128, truncate_user=256,
-            grep_pattern=None, quiet=False):
-    if output_dir is None:
-        output_dir = os.path.dirname(os.path.abspath(input_path)) or "."
-    os.makedirs(output_dir, exist_ok=True)
-    base = os.path.splitext(os.path.basename(input_path))[0]
-
-    recs = merge_chunks(lex(input_path))
-    chains = split_chains(recs)
-    if not chains:
-        if not quiet:
-            print("No conversation chains found.")
+    return first
+
+
+# ── search-only ──
+#
+# --search-only never renders or writes anything, and a file whose raw bytes
+# can't contain a match is not even parsed. The prefilter needs words every
+# match must contain, taken from the regex's literal parts. Only ASCII word
+# characters are used (JSON escapes quotes, backslashes, newlines and maybe
+# non-ASCII), and words VCC itself writes into searchable text are skipped.
+# The needles are only a hint:
+# - Text is searched after _sanitize, which can join a word that the raw
+#   bytes hold split by an escape sequence or control character. A file
+#   holding any of those is parsed regardless.
+# - Patterns with scoped inline flags like (?i:...) get no prefilter.
+# - Case-insensitive ones compare lowercased bytes, cutting words at the
+#   letters that also fold to non-ASCII characters.
+
+_SYNTH_TEXT = ("[image: _img_0.png.jpg] [document: _doc_0.bin] "
+               "[content redacted by model provider] True False None")
+_WORD_RE = re.compile(r"[A-Za-z0-9_]+")
+_DIGITS_RE = re.compile(r"[0-9]+")
+_SCOPED_FLAGS_RE = re.compile(r"\(\?(?:[aiLmsux]+(?:-[imsx]*)?|-[imsx]+):")
+_FOLD_SPLIT_RE = re.compile(r"[iksIKS]")  # re.I also maps these to ı İ ſ K
+# What _sanitize drops, as it appears in raw JSONL: \r, \f, \b and \u00XX
+# escapes of control characters, and raw DEL or UTF-8 C1 controls.
+_SANITIZED_RE = re.compile(
+    rb"\\[rfb]|\\u00(?:[01][0-9a-fA-F]|7[fF]|[89][0-9a-fA-F])|\x7f|\xc2[\x80-\x9f]")
+
+def _synthetic(word, text):
+    """Could word come from generated text? Digit runs compare as one '0',
+    so media counters and chain suffixes of any value are covered."""
+    return _DIGITS_RE.sub("0", word) in text
+
+def _sre_modules():
+    """re's parser and its constants, or None where neither the 3.11+
+    private modules nor the older sre_parse are importable."""
+    try:
+        from re import _constants as sre, _parser as sre_parse
+    except ImportError:
+        try:
+            import sre_constants as sre, sre_parse
+        except ImportError:
+            return None
+    return sre, sre_parse
+
+def _required_words(items, sre):
+    """Words every match of a parsed (sub)pattern must contain."""
+    words, run = [], []
+    def flush():
+        words.extend(_WORD_RE.findall("".join(run)))
+        run.clear()
+    for op, av in items:
+        if op is sre.LITERAL:
+            run.append(chr(av))
+            continue
+        flush()
+        if op is sre.SUBPATTERN:
+            words.extend(_required_words(av[-1], sre))
+        elif op in (sre.MAX_REPEAT, sre.MIN_REPEAT) and av[0] >= 1:
+            words.extend(_required_words(av[2], sre))
+    flush()
+    return words
+
+def prefilter_needles(q):
+    """(needles, fold): a file must contain one of the byte strings needles,
+    lowercased first if fold, to possibly match a --grep term of q. None
+    when no safe prefilter exists."""
+    mods = _sre_modules()
+    if mods is None:
+        return None
+    fold = any(regex.flags & re.IGNORECASE for regex in q.terms[:q.n_any])
+    needles = []
+    for regex in q.terms[:q.n_any]:
+        n = _regex_needles(regex, fold, *mods)
+        if n is None:
+            return None
+        needles.extend(n)
+    return needles, fold
+
+def _regex_needles(regex, fold, sre, sre_parse):
+    if _SCOPED_FLAGS_RE.search(regex.pattern):
+        return None
+    try:
+        items = list(sre_parse.parse(regex.pattern, regex.flags))
+    except re.error:
+        return None
+    while len(items) == 1 and items[0][0] is sre.SUBPATTERN:
+        items = list(items[0][1][-1])
+    branches = items[0][1][1] if len(items) == 1 and items[0][0] is sre.BRANCH else [items]
+    synth = _SYNTH_TEXT.lower() if fold else _SYNTH_TEXT
+    needles = []
+    for b in branches:
+        words = _required_words(b, sre)
+        if fold:
+            words = [p for w in words for p in _FOLD_SPLIT_RE.split(w.lower()) if p]
+        words = [w for w in words if not _synthetic(w, synth)]
+        if not words:
+            return None
+        needles.append(max(words, key=len).encode())
+    return needles
+
+def _file_contains_any(path, needles, fold=False, chunk=1 << 20):
+    """Could path hold a match? True on a needle, or on anything _sanitize
+    would strip, since that can join a needle split in the raw bytes."""
+    keep = max(max(len(n) for n in needles), 6) - 1
+    tail = b""
+    with _open_jsonl(path) as f:
+        while True:
+            b = f.read(chunk)
+            if not b:
+                return False
+            buf = tail + (b.lower() if fold else b)
+            if any(n in buf for n in needles) or _SANITIZED_RE.search(buf):
+                return True
+            tail = buf[-keep:]
+
+def _search(input_path, output_dir=None, grep_pattern=None, prefilter=None):
+    """Grep hits of one file, as _compile would report them, writing nothing.
+    Line refs still point at where the .txt files would go. prefilter is
+    what prefilter_needles gave, if anything."""
+    output_dir, base = _out_base(input_path, output_dir)
+    # Media file names embed the file's own name; a needle that could come
+    # from one proves nothing about the raw bytes.
+    names = _DIGITS_RE.sub("0", f"{base}_0_img_0 {base}_doc_0")
+    needles, fold = prefilter or (None, False)
+    if fold:
+        names = names.lower()
+    if (needles and not any(_synthetic(n.decode(), names) for n in needles)
+            and not _file_contains_any(input_path, needles, fold)):
         return []
+    seen = set()
+    return _session_hits([(fp, grep_hits(fp, ir, grep_pattern, seen))
+                          for fp, ir in _iter_irs(input_path, output_dir)],
+                         seen, grep_pattern)
+
+def _iter_irs(input_path, output_dir=None):
+    """(.txt path, IR with lines assigned) per chain, named as _compile names
+    them. Writes nothing; media get their names but no files."""
+    output_dir, base = _out_base(input_path, output_dir)
+    multi = False
+    for i, (chain, more) in enumerate(_iter_chains(merge_chunks(lex(input_path)))):
+        if i == 0:
+            multi = more
+        sfx = f"_{i+1}" if multi else ""
+        ir = parse(chain, {}, f"{base}{sfx}", [0])
+        assign_lines(ir)
+        yield os.path.join(output_dir, f"{base}{sfx}.txt"), ir
 
-    results, paths = [], []
-
-    for i, chain in enumerate(chains):
-        sfx = f"_{i+1}" if len(chains) > 1 else ""
-        ffn = f"{base}{sfx}.txt"
-        mfn = f"{base}{sfx}.min.txt"
-        vfn = f"{base}{sfx}.view.txt"
-        fp = os.path.join(output_dir, ffn)
-        mp = os.path.join(output_dir, mfn)
-        vp = os.path.join(output_dir, vfn)
-        data_ctr = [0]
 
-        ir = parse(chain, output_dir, f"{base}{sfx}", data_ctr)
-        assign_lines(ir)
-        lower_brief(ir, truncate, ffn, truncate_user)
+# ── cache ──
+#
+# A hidden manifest per source in the output dir records what the last run
+# wrote. An unchanged source (size + mtime) is not recompiled at all. An
+# appended one keeps every chain sealed by a later compact_boundary — checked
+# by a digest of the bytes before the last chain — and re-renders from there.
 
-        full = emit(ir, "content")
-        brief = emit(ir, "content_brief")
+_CACHE_VERSION = 2
 
-        stats_footer = _collect_stats(chain)
-        if stats_footer:
-            full.extend([""] + stats_footer)
+def _prefix_digest(path, n):
+    h = hashlib.blake2b(digest_size=16)
+    with _open_jsonl(path) as f:
+        while n > 0:
+            b = f.read(min(n, 1 << 20))
+            if not b: break
+            h.update(b)
+            n -= len(b)
+    return h.hexdigest()
 
-        with open(fp, "w", encoding="utf-8") as f: f.write("\n".join(full))
-        with open(mp, "w", encoding="utf-8") as f: f.write("\n".join(brief))
+def _load_manifest(man_path, input_path, opts):
+    try:
+        with open(man_path, encoding="utf-8") as f:
+            man = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (man.get("version") != _CACHE_VERSION or man.get("opts") != opts
+            or man.get("source") != os.path.abspath(input_path)):
+        return None
+    if not all(os.path.exists(p) for c in man["chains"]
+               for p in (*c["paths"][:2], c["paths"][0][:-4] + ".idx")):
+        return None
+    return man
+
+def _save_manifest(man_path, input_path, opts, st, chains):
+    last = chains[-1]["start"] if chains else 0
+    _write_manifest(man_path, {
+        "version": _CACHE_VERSION, "source": os.path.abspath(input_path),
+        "opts": opts, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+        "digest": _prefix_digest(input_path, last), "chains": chains})
+
+def _write_manifest(man_path, man):
+    tmp = man_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(man, f)
+    os.replace(tmp, man_path)
+
+def _reusable_chains(man, input_path, st):
+    """(chains to keep, byte offset to resume lexing at) for an appended source.
+
+    Only a multi-chain source qualifies: a single chain gains a _1 suffix
+    once a second one appears, so everything is re-rendered anyway."""
+    if not man or st.st_size < man["size"] or len(man["chains"]) < 2:
+        return [], 0
+    start = man["chains"][-1]["start"]
+    if _prefix_digest(input_path, start) != man["digest"]:
+        return [], 0
+    return man["chains"][:-1], start
+
+def _cached_paths(c):
+    fp, mp, fl, fw, bl, bw = c["paths"]
+    return fp, mp, None, fl, fw, bl, bw
 
-        if grep_pattern:
-            lower_view(ir, ffn, grep_pattern)
-            view = emit(ir, "content_view")
-            with open(vp, "w", encoding="utf-8") as f: f.write("\n".join(view))
 
-        ft, bt = "\n".join(full), "\n".join(brief)
-        _cnt = lambda s: sum(1 for t in _tokenize(s) if t.strip())
-        results.append((fp, ir))
-        paths.append((fp, mp, vp if grep_pattern else None,
-                       len(full), _cnt(ft), len(brief), _cnt(bt)))
+# ── compile ──
 
+def compile_pass(input_path, output_dir=None, truncate=128, truncate_user=256,
+            grep_pattern=None, quiet=False, cache=True):
+    results, paths = _compile(input_path, output_dir, truncate, truncate_user,
+                              grep_pattern, cache)
     if not quiet:
-        for fp, _, _, fl, fw, _, _ in paths:
-            print(f"  {fp}  ({fl} lines, {fw} words)")
-        for _, mp, _, _, _, bl, bw in paths:
-            print(f"  {mp}  ({bl} lines, {bw} words)")
-        if grep_pattern:
-            for _, _, vp, _, _, _, _ in paths:
-                if vp:
-                    print(f"  {vp}")
-
+        _report(paths, grep_pattern)
     return results
 
+def _out_base(input_path, output_dir):
+    if output_dir is None:
+        output_dir = os.path.dirname(os.path.abspath(input_path)) or "."
+    name = os.path.basename(input_path)
+    if os.path.splitext(name)[1] in _CODECS:
+        name = os.path.splitext(name)[0]
+    return output_dir, os.path.splitext(name)[0]
+
+def _compile(input_path, output_dir=None, truncate=128, truncate_user=256,
+             grep_pattern=None, cache=True, jobs=1):
+    """Compile one file. Returns (grep results, written paths); no printing,
+    so it can run in a worker process. With jobs > 1, a file of several
+    chains compiles them across that many processes."""
+    output_dir, base = _out_base(input_path, output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    st = os.stat(input_path)
+    opts = [truncate, truncate_user]
+    man_path = os.path.join(output_dir, f".{base}.vcc.json")
+
+    # --grep needs every chain's IR, so it always compiles in full (and
+    # refreshes the manifest for the next plain run).
+    man = _load_manifest(man_path, input_path, opts) if cache and not grep_pattern else None
+    if man and man["size"] == st.st_size and man["mtime_ns"] == st.st_mtime_ns:
+        return ([(c["paths"][0], None) for c in man["chains"]],
+                [_cached_paths(c) for c in man["chains"]])
+    kept, start = _reusable_chains(man, input_path, st)
+
+    results = [(c["paths"][0], None) for c in kept]
+    paths = [_cached_paths(c) for c in kept]
+    chains = list(kept)
+    chain_opts = (output_dir, base, truncate, truncate_user, grep_pattern)
+    seen = set()
+
+    spans = _chain_spans(input_path, start) if jobs > 1 else []
+    if len(spans) > 1:
+        # Each chain's names and media numbers depend only on its index, so
+        # chains compile independently; results come back in order.
+        first = len(kept)
+        work = partial(_compile_span, input_path, multi=True, opts=chain_opts)
+        with ProcessPoolExecutor(max_workers=min(jobs, len(spans))) as pool:
+            for i, (a, _), (res, ps, c, terms) in zip(
+                    itertools.count(first), spans,
+                    pool.map(work, spans, range(first, first + len(spans)))):
+                results.append(res)
+                paths.append(ps)
+                seen |= terms
+                chains.append({"start": start if i == first else a, "paths": c})
+    else:
+        multi = bool(kept)
+        marks = []
+        recs = merge_chunks(lex(input_path, start, marks))
+        for i, (chain, more) in enumerate(_iter_chains(recs), len(kept)):
+            if i == 0:
+                multi = more
+            # A chain begins just past the last compact_boundary before its
+            # first record, as _chain_spans splits them. marks may already
+            # run further: merge_chunks reads ahead of what it yields.
+            chain_start = start
+            if i > len(kept):
+                chain_start = marks[bisect.bisect_right(marks, chain[0]["_offset"]) - 1]
+            res, ps, c, terms = _compile_chain(chain, i, multi, *chain_opts)
+            results.append(res)
+            paths.append(ps)
+            seen |= terms
+            chains.append({"start": chain_start, "paths": c})
+
+    if cache:
+        _save_manifest(man_path, input_path, opts, st, chains)
+    if grep_pattern:
+        results = _session_hits(results, seen, grep_pattern, views=True)
+    return results, paths
+
+def _compile_chain(chain, i, multi, output_dir, base, truncate, truncate_user,
+                   grep_pattern):
+    """Write chain i's outputs. Returns (grep result, paths row, manifest
+    paths, grep terms matched)."""
+    sfx = f"_{i+1}" if multi else ""
+    ffn = f"{base}{sfx}.txt"
+    mfn = f"{base}{sfx}.min.txt"
+    vfn = f"{base}{sfx}.view.txt"
+    fp = os.path.join(output_dir, ffn)
+    mp = os.path.join(output_dir, mfn)
+    vp = os.path.join(output_dir, vfn)
+    media = {}
+
+    tid_name = _tool_names(chain)
+    ir = parse(chain, media, f"{base}{sfx}", [0], tid_name)
+    assign_lines(ir)
+    write_idx(os.path.join(output_dir, f"{base}{sfx}.idx"), ir, tid_name)
+    lower_brief(ir, truncate, ffn, truncate_user)
+
+    fw, bw = [0], [0]
+    full = emit(ir, "content", fw)
+    brief = emit(ir, "content_brief", bw)
+
+    stats_footer = _collect_stats(chain)
+    if stats_footer:
+        full.extend([""] + stats_footer)
+        fw[0] += _count_words(stats_footer)
+
+    with open(fp, "w", encoding="utf-8") as f: f.write("\n".join(full))
+    with open(mp, "w", encoding="utf-8") as f: f.write("\n".join(brief))
+    write_media(output_dir, media.values())
+
+    if grep_pattern:
+        lower_view(ir, ffn, grep_pattern)
+        view = emit(ir, "content_view")
+        with open(vp, "w", encoding="utf-8") as f: f.write("\n".join(view))
+
+    # Only the grep hits outlive the chain; its IR is released here.
+    counts = [len(full), fw[0], len(brief), bw[0]]
+    seen = set()
+    return ((fp, grep_hits(fp, ir, grep_pattern, seen) if grep_pattern else None),
+            (fp, mp, vp if grep_pattern else None, *counts),
+            [fp, mp, *counts], seen)
+
+def _chain_spans(path, start=0):
+    """Byte spans [a, b) of the chains from start on, as _iter_chains would
+    split them; the last one runs to EOF (b is None). Only lines that mention
+    compact_boundary are decoded, plus the first few of each span to drop
+    those _iter_chains skips for holding nothing but discardable records."""
+    spans, a, pos = [], start, start
+    with _open_jsonl(path) as f:
+        f.seek(start)
+        for l in f:
+            off = pos
+            pos += len(l)
+            if b"compact_boundary" not in l:
+                continue
+            try:
+                r = json.loads(l)
+            except ValueError:
+                continue
+            if r.get("type") == "system" and r.get("subtype") == "compact_boundary":
+                spans.append((a, off))
+                a = pos
+    spans.append((a, None))
+    return [(a, b) for a, b in spans
+            if any(not _discard(r) for r in lex(path, a, end=b))]
+
+def _compile_span(input_path, span, i, multi, opts):
+    """_compile_chain for the chain in span, read in a worker process."""
+    chain = [r for r in merge_chunks(lex(input_path, span[0], end=span[1]))
+             if not _discard(r)]
+    return _compile_chain(chain, i, multi, *opts)
+
+def _report(paths, grep_pattern):
+    if not paths:
+        print("No conversation chains found.")
+        return
+    for fp, _, _, fl, fw, _, _ in paths:
+        print(f"  {fp}  ({fl} lines, {fw} words)")
+    for _, mp, _, _, _, bl, bw in paths:
+        print(f"  {mp}  ({bl} lines, {bw} words)")
+    if grep_pattern:
+        for _, _, vp, _, _, _, _ in paths:
+            if vp:
+                print(f"  {vp}")
+
+# ── follow ──
+#
+# --follow compiles as usual, then keeps the last chain's .txt, .min.txt and
+# .idx growing as the session is written: appended records are lexed from
+# where the last one ended and pushed through merge_chunks and parse_iter, so
+# earlier lines never move. A streamed assistant message shows up once the
+# record after it does. .min.txt trails a little further: its lines are
+# lowered once the next user or assistant section starts, by which point the
+# tool results its summaries point at are in. The stats footer is left out
+# while following. A compact_boundary ends the chain: it is recompiled in
+# full and following moves on to the new one.
+
+_FOLLOW_POLL = 0.5  # seconds between looks at a quiet file
+
+def _tail(path, start, idle):
+    """lex for a file that is still being written. At EOF, or mid-line, calls
+    idle() to wait for more. Stops if idle() returns true or the file shrinks
+    below what was read."""
+    with open(path, "rb") as f:
+        pos = start
+        while True:
+            f.seek(pos)
+            for l in f:
+                if not l.endswith(b"\n"):
+                    break
+                off = pos
+                pos += len(l)
+                if l.strip():
+                    r = json.loads(l)
+                    r["_offset"] = off
+                    yield r
+            if os.fstat(f.fileno()).st_size < pos or idle():
+                return
+
+def _chain_tail(input_path, start, idle, tid_name):
+    """Records of the chain beginning at start, as _iter_chains would give
+    them, until the next chain gets its first record."""
+    seen = ended = False
+    for r in merge_chunks(_tail(input_path, start, idle)):
+        if _discard(r):
+            continue
+        if r.get("type") == "system" and r.get("subtype") == "compact_boundary":
+            ended = seen
+            continue
+        if ended:
+            return
+        seen = True
+        tid_name.update(_tool_names([r]))
+        yield r
+
+def _follow_chain(input_path, fp, start, truncate=128, truncate_user=256):
+    """Rewrite one chain's outputs from its first record on, then keep
+    appending to them. Returns when the chain ends."""
+    ffn = os.path.basename(fp)
+    outdir = os.path.dirname(fp)
+    tid_name, media = {}, {}
+    # assign_lines and emit each walk the nodes, so each keeps its own state.
+    line_walk, full_walk, brief_walk = [None, None], [None, None], [None, None]
+    line, pending, context = 0, [], (None, False)
+    tids_done, named, media_done = set(), set(), 0
+
+    with open(fp, "w", encoding="utf-8") as ff, \
+         open(fp[:-4] + ".min.txt", "w", encoding="utf-8") as mf, \
+         open(fp[:-4] + ".idx", "w", encoding="utf-8") as xf:
+
+        def _lower(cut):
+            # Lower the nodes not yet in .min.txt; write out the first `cut`.
+            nonlocal pending, context
+            visible = lower_brief(pending, truncate, ffn, truncate_user, context)
+            done, pending = pending[:cut], pending[cut:]
+            secs = [s for s in {o.sec for o in done} if s in visible]
+            if secs:
+                context = (_sec_roles(done)[max(secs)], True)
+            for lt in emit(done, "content_brief", state=brief_walk):
+                mf.write(lt + "\n")
+
+        xf.write(f"# vcc-idx {_IDX_VERSION}\n")
+        stopped = []
+
+        def idle():
+            ff.flush(), mf.flush(), xf.flush()
+            try:
+                time.sleep(_FOLLOW_POLL)
+            except KeyboardInterrupt:
+                # End the stream so records merge_chunks holds back still
+                # get written, then stop once they are.
+                stopped.append(True)
+                return True
+        try:
+            for nodes in parse_iter(_chain_tail(input_path, start, idle, tid_name),
+                                    media, ffn[:-4], [0], tid_name):
+                line = assign_lines(nodes, line, line_walk)
+                for lt in emit(nodes, "content", state=full_walk):
+                    ff.write(lt + "\n")
+                tids = [(t, n) for t, n in tid_name.items() if t not in tids_done]
+                tids_done.update(t for t, _ in tids)
+                for row in _idx_rows(nodes, tids, named):
+                    xf.write(row + "\n")
+                write_media(outdir, itertools.islice(media.values(), media_done, None))
+                media_done = len(media)
+
+                # A new user or assistant section settles everything before
+                # its separator.
+                cut = None
+                for i, o in enumerate(nodes):
+                    if o.type == "meta_header" and not o.content[0].startswith("[tool"):
+                        cut = len(pending) + i
+                pending.extend(nodes)
+                if cut:
+                    if SEP in pending[cut - 1].content:
+                        cut -= 1
+                    _lower(cut)
+        finally:
+            _lower(len(pending))
+    if stopped:
+        raise KeyboardInterrupt
+
+def follow(input_path, output_dir=None, truncate=128, truncate_user=256):
+    """Compile, then follow the last chain as the session grows. Runs until
+    interrupted."""
+    output_dir, base = _out_base(input_path, output_dir)
+    man_path = os.path.join(output_dir, f".{base}.vcc.json")
+    while True:
+        _, paths = _compile(input_path, output_dir, truncate, truncate_user)
+        with open(man_path, encoding="utf-8") as f:
+            man = json.load(f)
+        if man["chains"]:
+            fp, start = man["chains"][-1]["paths"][0], man["chains"][-1]["start"]
+        else:
+            fp, start = os.path.join(output_dir, f"{base}.txt"), 0
+        # The last chain is about to lose its footer: make the next compile
+        # redo it (size -1 fails the unchanged check, not the append one).
+        man["size"] = -1
+        _write_manifest(man_path, man)
+        print(f"  following {fp}", flush=True)
+        _follow_chain(input_path, fp, start, truncate, truncate_user)
+
+
+# ── serve ──
+#
+# `VCC.py serve` keeps parsed chains in memory between runs. A client is the
+# usual command line plus --server: its argv and cwd go over a Unix socket,
+# the server runs them through main() and sends back the output and exit
+# code. Requests are handled one at a time. --grep, --search-only and --range
+# read the IRs from an LRU keyed by source path, checked against size + mtime
+# and bounded by the total size of the sources held. Plain compiles still go
+# through the manifest, which already makes an unchanged file free.
+
+def _serve_socket():
+    return (os.environ.get("VCC_SOCKET")
+            or os.path.join(tempfile.gettempdir(), f"vcc-{os.getuid()}.sock"))
+
+class _IRCache:
+    """Parsed chains per source, least recently used dropped first once the
+    sources add up to more than limit bytes."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.total = 0
+        self.entries = OrderedDict()  # key -> (size, mtime_ns, chains)
+
+    def chains(self, input_path, output_dir=None):
+        """[[.txt path, IR, .txt lines or None]] per chain of the file as it
+        is now. Paths are absolute, so hits can be made relative to any cwd."""
+        key = (os.path.abspath(input_path), output_dir and os.path.abspath(output_dir))
+        st = os.stat(input_path)
+        hit = self.entries.pop(key, None)
+        if hit:
+            self.total -= hit[0]
+        if hit and hit[:2] == (st.st_size, st.st_mtime_ns):
+            chains = hit[2]
+        else:
+            chains = [[fp, ir, None] for fp, ir in _iter_irs(*key)]
+        self.entries[key] = (st.st_size, st.st_mtime_ns, chains)
+        self.total += st.st_size
+        while self.total > self.limit and len(self.entries) > 1:
+            self.total -= self.entries.popitem(last=False)[1][0]
+        return chains
+
+def _compile_warm(input_path, irs, output_dir=None, truncate=128, truncate_user=256,
+                  grep_pattern=None, cache=True):
+    """_compile, with the grep hits and .view.txt taken from cached IRs
+    rather than a full recompile."""
+    results, paths = _compile(input_path, output_dir, truncate, truncate_user,
+                              cache=cache)
+    if grep_pattern:
+        results, seen = [], set()
+        for fp, ir, _ in irs.chains(input_path, output_dir):
+            lower_view(ir, os.path.basename(fp), grep_pattern)
+            with open(fp[:-4] + ".view.txt", "w", encoding="utf-8") as f:
+                f.write("\n".join(emit(ir, "content_view")))
+            results.append((fp, grep_hits(fp, ir, grep_pattern, seen)))
+        results = _session_hits(results, seen, grep_pattern, views=True)
+    return results, paths
+
+def _search_warm(input_path, irs, output_dir=None, grep_pattern=None):
+    """_search on cached IRs."""
+    seen = set()
+    return _session_hits([(fp, grep_hits(fp, ir, grep_pattern, seen))
+                          for fp, ir, _ in irs.chains(input_path, output_dir)],
+                         seen, grep_pattern)
+
+def _serve_one(req, irs):
+    out, err = io.StringIO(), io.StringIO()
+    code = 0
+    with redirect_stdout(out), redirect_stderr(err):
+        try:
+            os.chdir(req["cwd"])
+            main(req["argv"], irs)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else int(e.code is not None)
+            if isinstance(e.code, str):
+                print(e.code, file=sys.stderr)
+        except Exception:
+            traceback.print_exc()
+            code = 1
+    return {"out": out.getvalue(), "err": err.getvalue(), "code": code}
+
+def serve(sock_path, cache_mb=512):
+    """Answer VCC runs on sock_path until interrupted."""
+    irs = _IRCache(cache_mb << 20)
+    if os.path.exists(sock_path):
+        with socket.socket(socket.AF_UNIX) as s:
+            if s.connect_ex(sock_path) == 0:
+                sys.exit(f"{sock_path}: a VCC server is already listening")
+        os.unlink(sock_path)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            req = self.rfile.read()
+            if not req:  # a liveness probe
+                return
+            reply = _serve_one(json.loads(req), irs)
+            self.wfile.write(json.dumps(reply).encode())
+
+    umask = os.umask(0o177)  # the socket is for this user only
+    try:
+        srv = socketserver.UnixStreamServer(sock_path, Handler)
+    finally:
+        os.umask(umask)
+    with srv:
+        print(f"  serving on {sock_path}", flush=True)
+        try:
+            srv.serve_forever()
+        finally:
+            os.unlink(sock_path)
+
+def _ask_server(sock_path, argv):
+    """Run argv on the VCC server at sock_path; returns its exit code."""
+    try:
+        with socket.socket(socket.AF_UNIX) as s:
+            s.connect(sock_path)
+            s.sendall(json.dumps({"argv": argv, "cwd": os.getcwd()}).encode())
+            s.shutdown(socket.SHUT_WR)
+            reply = json.loads(b"".join(iter(partial(s.recv, 1 << 16), b"")))
+    except OSError as e:
+        sys.exit(f"{sock_path}: no VCC server reachable ({e.strerror or e}); "
+                 "start one with `VCC.py serve`")
+    sys.stdout.write(reply["out"])
+    sys.stderr.write(reply["err"])
+    return reply["code"]
+
+
 # ── main ──
 
+_RANGE_RE = re.compile(r"(?:(.+):)?(\d+)(?:-(\d+))?")
+
 def _expand_inputs(raw):
     files = []
     for r in raw:
@@ -1051,25 +1934,128 @@ def _expand_inputs(raw):
         files.extend(expanded if expanded else [r])
     return files
 
-def main():
+def _serve_main(argv):
+    p = argparse.ArgumentParser(prog="VCC.py serve",
+                                description="VCC - answer --server runs from memory")
+    p.add_argument("--socket", default=_serve_socket())
+    p.add_argument("--cache-mb", type=int, default=512, metavar="N")
+    a = p.parse_args(argv)
+    try:
+        serve(a.socket, a.cache_mb)
+    except KeyboardInterrupt:
+        pass
+
+def main(argv=None, irs=None):
+    """Command line entry. irs is the server's _IRCache when serving a run."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        return _serve_main(argv[1:])
     p = argparse.ArgumentParser(description="VCC - View-oriented Conversation Compiler")
     p.add_argument("input", nargs="+")
     p.add_argument("-o", "--output-dir")
     p.add_argument("-t", "--truncate", nargs="?", type=int, const=128, default=128, metavar="N")
     p.add_argument("-tu", "--truncate-user", nargs="?", type=int, const=256, default=256, metavar="N")
-    p.add_argument("--grep", metavar="PATTERN")
-    a = p.parse_args()
-    try:
-        a.grep = re.compile(a.grep) if a.grep else None
-    except re.error as e:
-        p.error(f"invalid regex for --grep: {e}")
+    p.add_argument("--grep", action="append", metavar="PATTERN")
+    p.add_argument("--and", action="append", default=[], dest="and_", metavar="PATTERN")
+    p.add_argument("--not", action="append", default=[], dest="not_", metavar="PATTERN")
+    p.add_argument("--search-only", action="store_true")
+    p.add_argument("--range", metavar="[NAME.txt:]N-M")
+    p.add_argument("--follow", action="store_true")
+    p.add_argument("--no-cache", action="store_true")
+    p.add_argument("-j", "--jobs", nargs="?", type=int, const=os.cpu_count() or 1, default=1,
+                   metavar="N")
+    p.add_argument("--server", nargs="?", const="", metavar="SOCKET")
+    a = p.parse_args(argv)
+    if a.server is not None and irs is None:
+        sys.exit(_ask_server(a.server or _serve_socket(), argv))
+    if (a.and_ or a.not_) and not a.grep:
+        p.error("--and and --not need a --grep term")
+    terms = {}
+    for opt, pats in (("--grep", a.grep or []), ("--and", a.and_), ("--not", a.not_)):
+        try:
+            terms[opt] = [re.compile(pat) for pat in pats]
+        except re.error as e:
+            p.error(f"invalid regex for {opt}: {e}")
+    a.grep = GrepQuery(terms["--grep"], terms["--and"], terms["--not"]) if a.grep else None
+    if a.search_only and not a.grep:
+        p.error("--search-only requires --grep")
+    files = _expand_inputs(a.input)
+    if a.follow:
+        if len(files) != 1 or a.grep or a.range or irs:
+            p.error("--follow takes exactly one input file, without --grep, --range or --server")
+        if os.path.splitext(files[0])[1] in _CODECS:
+            p.error("--follow needs an uncompressed .jsonl")
+        try:
+            follow(files[0], a.output_dir, a.truncate, a.truncate_user)
+        except KeyboardInterrupt:
+            pass
+        return
+    if a.range:
+        if len(files) != 1:
+            p.error("--range takes exactly one input file")
+        m = _RANGE_RE.fullmatch(a.range)
+        if not m:
+            p.error(f"invalid --range {a.range!r}, expected [NAME.txt:]N-M")
+        if irs is not None:
+            chains = irs.chains(files[0], a.output_dir)
+            fps = [c[0] for c in chains]
+        else:
+            # Brings the .idx up to date; a no-op when the manifest says it is.
+            _, paths = _compile(files[0], a.output_dir, a.truncate, a.truncate_user,
+                                cache=not a.no_cache)
+            fps = [fp for fp, *_ in paths]
+        names = [os.path.basename(fp) for fp in fps]
+        name = m.group(1)
+        hit = [i for i, n in enumerate(names) if name in (n, _short(n))]
+        if name is None and len(fps) == 1:
+            hit = [0]
+        if len(hit) != 1:
+            p.error(f"--range needs one of: {', '.join(n + ':N-M' for n in names)}")
+        lo, hi = int(m.group(2)), int(m.group(3) or m.group(2))
+        if irs is not None:
+            c = chains[hit[0]]
+            if c[2] is None:
+                c[2] = emit(c[1])
+            lines = c[2][max(lo - 1, 0):hi]
+        else:
+            lines = render_range(files[0], fps[hit[0]][:-4] + ".idx", lo, hi)
+        for line in lines:
+            print(line)
+        return
+    # The server keeps one process, so its cached IRs are used from it.
+    jobs = 1 if irs is not None else min(a.jobs, len(files))
+    if a.search_only:
+        # Newest file first, as grep_search orders hits, so each file's hits
+        # can be printed as soon as it is searched.
+        if irs is not None:
+            work = partial(_search_warm, irs=irs, output_dir=a.output_dir,
+                           grep_pattern=a.grep)
+        else:
+            work = partial(_search, output_dir=a.output_dir, grep_pattern=a.grep,
+                           prefilter=prefilter_needles(a.grep))
+        first = True
+        with (ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else nullcontext()) as pool:
+            for res in (pool.map(work, files[::-1]) if pool else map(work, files[::-1])):
+                first = grep_search(res, first)
+        return
+    if irs is not None:
+        compile_one = partial(_compile_warm, irs=irs)
+    else:
+        # A lone file spreads its chains over the processes instead.
+        compile_one = partial(_compile, jobs=a.jobs if len(files) == 1 else 1)
+    work = partial(compile_one, output_dir=a.output_dir, truncate=a.truncate,
+                   truncate_user=a.truncate_user, grep_pattern=a.grep,
+                   cache=not a.no_cache)
     all_results = []
-    for f in _expand_inputs(a.input):
-        res = compile_pass(f, a.output_dir, a.truncate, a.truncate_user,
-                      a.grep, quiet=bool(a.grep))
-        all_results.extend(res)
+    # Files compile in parallel, but results are consumed in input order so
+    # reports and grep output come out exactly as in a serial run.
+    with (ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else nullcontext()) as pool:
+        for res, paths in (pool.map(work, files) if pool else map(work, files)):
+            if not a.grep:
+                _report(paths, None)
+            all_results.extend(res)
     if a.grep:
-        grep_search(all_results, a.grep)
+        grep_search(all_results)
 
 if __name__ == "__main__":
     if sys.stdout.encoding and sys.stdout.encoding.lower().replace("-", "") != "utf8":
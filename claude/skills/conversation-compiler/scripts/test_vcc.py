@@ -0,0 +1,36 @@
+"""Regression tests for VCC.py. Run: python -m pytest claude/skills/conversation-compiler/scripts"""
+
+import json
+
+import VCC
+
+
+def _user(i, text):
+    return {"type": "user", "uuid": f"u{i}", "timestamp": f"2026-01-01T00:00:{i:02d}Z",
+            "message": {"role": "user", "content": text}}
+
+def _assistant(i, text, mid):
+    return {"type": "assistant", "uuid": f"a{i}", "timestamp": f"2026-01-01T00:00:{i:02d}Z",
+            "message": {"id": mid, "role": "assistant", "model": "m",
+                        "content": [{"type": "text", "text": text}]}}
+
+_BOUNDARY = {"type": "system", "subtype": "compact_boundary", "content": "Conversation compacted"}
+
+def _chain_starts(src, out, jobs):
+    VCC._compile(str(src), str(out), 128, 256, None, True, jobs=jobs)
+    with open(out / f".{src.stem}.vcc.json", encoding="utf-8") as f:
+        return [c["start"] for c in json.load(f)["chains"]]
+
+def test_manifest_chain_starts_match_parallel(tmp_path):
+    # The middle chain is one assistant record, which merge_chunks holds back
+    # until the next boundary has been read.
+    recs = [_user(0, "first"), _assistant(1, "one", "m1"), _BOUNDARY,
+            _assistant(2, "two", "m2"), _BOUNDARY,
+            _user(3, "third"), _assistant(4, "three", "m3")]
+    src = tmp_path / "s.jsonl"
+    src.write_text("".join(json.dumps(r) + "\n" for r in recs), encoding="utf-8")
+
+    serial = _chain_starts(src, tmp_path / "serial", 1)
+
+    assert serial == _chain_starts(src, tmp_path / "parallel", 2)
+    assert len(serial) == 3